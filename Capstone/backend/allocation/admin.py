@@ -0,0 +1,33 @@
+from django.contrib import admin
+from .models import AllocationRound, Statistic
+
+
+@admin.register(Statistic)
+class StatisticAdmin(admin.ModelAdmin):
+    list_display = ('key', 'shard', 'value')
+    search_fields = ('key',)
+    readonly_fields = ('key', 'shard', 'value')
+
+
+@admin.register(AllocationRound)
+class AllocationRoundAdmin(admin.ModelAdmin):
+    list_display = (
+        'name', 'formation_closes_at', 'applications_closes_at', 'decisions_closes_at', 'created_at'
+    )
+    search_fields = ('name',)
+    readonly_fields = ('formation_closed_at', 'applications_closed_at', 'decisions_closed_at')
+    
+    fieldsets = (
+        (None, {
+            'fields': ('name',)
+        }),
+        ('Team formation', {
+            'fields': ('formation_opens_at', 'formation_closes_at', 'formation_closed_at')
+        }),
+        ('Applications', {
+            'fields': ('applications_opens_at', 'applications_closes_at', 'applications_closed_at')
+        }),
+        ('Decisions', {
+            'fields': ('decisions_opens_at', 'decisions_closes_at', 'decisions_closed_at')
+        }),
+    )
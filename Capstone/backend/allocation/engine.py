@@ -0,0 +1,214 @@
+"""
+Admin-triggered allocation of teams to professors from ranked preferences.
+
+Pending applications and free slots are loaded with two queries, matched in
+memory, and the result is written back with chunked set-based updates inside
+a single transaction.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Value
+from django.db.models.functions import Concat, Trim
+from django.utils import timezone
+
+from applications.models import Application
+from events.broker import publish_batch
+from project_allocation.batches import chunks
+from teams.models import TeamMember
+from users.models import ProfessorProfile
+from . import stats
+from .matching import gale_shapley, min_cost_assignment
+
+ALGORITHMS = ('gale-shapley', 'min-cost')
+
+class AllocationConflict(Exception):
+    """Raised when applications or slots changed while the allocation was applied"""
+
+
+class AllocationPlan:
+    """Result of matching pending applications, with a diff against the current state"""
+
+    def __init__(self, algorithm, applications, capacity, matches):
+        self.algorithm = algorithm
+        self.applications = applications
+        self.capacity = capacity
+        self.matches = matches
+
+        self.accepted = [row for row in applications if matches.get(row['team_id']) == row['professor_id']]
+        self.withdrawn = [
+            row for row in applications
+            if row['team_id'] in matches and matches[row['team_id']] != row['professor_id']
+        ]
+
+    @property
+    def teams(self):
+        return {row['team_id'] for row in self.applications}
+
+    def summary(self):
+        teams = self.teams
+        return {
+            'algorithm': self.algorithm,
+            'teams_considered': len(teams),
+            'teams_placed': len(self.matches),
+            'teams_unplaced': len(teams) - len(self.matches),
+            'average_team_rank': round(
+                sum(row['position'] for row in self.accepted) / len(self.accepted), 2
+            ) if self.accepted else None,
+            'slots_available': sum(self.capacity.values()),
+            'slots_filled': len(self.accepted),
+        }
+
+    def diff(self):
+        """Status changes the plan would make, one entry per application"""
+        return [
+            {
+                'application_id': row['pk'],
+                'team_id': row['team_id'],
+                'team_name': row['team_name'],
+                'professor_id': row['professor_id'],
+                'professor_name': row['professor_name'],
+                'team_rank': row['position'],
+                'from': 'pending',
+                'to': status,
+            }
+            for status, rows in (('accepted', self.accepted), ('withdrawn', self.withdrawn))
+            for row in rows
+        ]
+
+    def as_dict(self):
+        return {**self.summary(), 'changes': self.diff()}
+
+
+def load_applications():
+    """Pending applications of teams that have no professor yet, in a single query"""
+    rows = list(
+        Application.objects.filter(status='pending').exclude(
+            Exists(Application.objects.filter(team=OuterRef('team'), status='accepted'))
+        ).annotate(
+            team_name=F('team__name'),
+            department=F('professor__user__department'),
+            professor_name=Trim(Concat(
+                'professor__user__first_name', Value(' '), 'professor__user__last_name'
+            )),
+        ).order_by('pk').values(
+            'pk', 'team_id', 'team_name', 'professor_id', 'professor_name', 'department',
+            'team_rank', 'professor_rank', 'submitted_at',
+        )
+    )
+
+    # Unranked choices come after ranked ones, earliest application first
+    by_team = defaultdict(list)
+    for row in rows:
+        by_team[row['team_id']].append(row)
+    for choices in by_team.values():
+        choices.sort(key=lambda row: (row['team_rank'] is None, row['team_rank'] or 0, row['submitted_at'], row['pk']))
+        for position, row in enumerate(choices, 1):
+            row['position'] = position
+    return rows
+
+
+def load_capacity():
+    """Free slots per professor"""
+    return dict(
+        ProfessorProfile.objects.filter(filled_slots__lt=F('total_slots')).annotate(
+            free=F('total_slots') - F('filled_slots')
+        ).values_list('pk', 'free')
+    )
+
+
+def plan_allocation(applications, capacity, algorithm='gale-shapley'):
+    """Match teams to professors in memory"""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f'Unknown algorithm {algorithm!r}')
+
+    proposals = defaultdict(list)
+    applicants = defaultdict(list)
+    for row in sorted(applications, key=lambda row: (row['team_id'], row['position'])):
+        proposals[row['team_id']].append(row['professor_id'])
+        applicants[row['professor_id']].append(row)
+
+    if algorithm == 'min-cost':
+        matches = min_cost_assignment(proposals, capacity)
+    else:
+        priority = {}
+        for professor_id, rows in applicants.items():
+            rows.sort(key=lambda row: (
+                row['professor_rank'] is None, row['professor_rank'] or 0, row['submitted_at'], row['pk']
+            ))
+            for position, row in enumerate(rows):
+                priority[row['team_id'], professor_id] = position
+        matches = gale_shapley(proposals, priority, capacity)
+
+    return AllocationPlan(algorithm, applications, capacity, matches)
+
+
+def allocate(algorithm='gale-shapley', dry_run=False):
+    """Plan and, unless dry_run, apply an allocation"""
+    plan = plan_allocation(load_applications(), load_capacity(), algorithm)
+    if dry_run or not plan.accepted:
+        return plan
+
+    try:
+        with transaction.atomic():
+            _apply(plan)
+    except IntegrityError:
+        raise AllocationConflict('A team was allocated while the allocation ran; run it again')
+    return plan
+
+
+def _apply(plan):
+    now = timezone.now()
+    pending = Application.objects.filter(status='pending')
+
+    accepted_ids = [row['pk'] for row in plan.accepted]
+    updated = sum(
+        pending.filter(pk__in=chunk).update(status='accepted', responded_at=now)
+        for chunk in chunks(accepted_ids)
+    )
+    if updated != len(accepted_ids):
+        raise AllocationConflict('Applications were answered while the allocation ran; run it again')
+
+    for chunk in chunks([row['pk'] for row in plan.withdrawn]):
+        pending.filter(pk__in=chunk).update(status='withdrawn', responded_at=now)
+
+    # Placed teams also leave every waitlist they were on
+    waitlisted = []
+    for chunk in chunks(list(plan.matches)):
+        waitlisted.extend(
+            Application.objects.filter(team_id__in=chunk, status='waitlisted').values(
+                'pk', 'team_id', 'professor_id', department=F('professor__user__department')
+            )
+        )
+    for chunk in chunks([row['pk'] for row in waitlisted]):
+        Application.objects.filter(pk__in=chunk, status='waitlisted').update(status='withdrawn', responded_at=now)
+
+    if ProfessorProfile.objects.fill_slots(Counter(row['professor_id'] for row in plan.accepted)):
+        raise AllocationConflict('Professor slots changed while the allocation ran; run it again')
+
+    deltas = Counter({'slots:filled': len(plan.accepted), 'teams:placed': len(plan.accepted)})
+    for status, rows in (('accepted', plan.accepted), ('withdrawn', plan.withdrawn)):
+        for row in rows:
+            deltas.update(stats.transition_deltas('pending', status, row['department']))
+    for row in waitlisted:
+        deltas.update(stats.transition_deltas('waitlisted', 'withdrawn', row['department']))
+
+    members = defaultdict(list)
+    team_ids = list(plan.matches)
+    for chunk in chunks(team_ids):
+        for team_id, user_id in TeamMember.objects.filter(
+            team_id__in=chunk, status='accepted'
+        ).values_list('team_id', 'user_id'):
+            members[team_id].append(user_id)
+
+    entries = []
+    for row in plan.accepted:
+        event = {'application_id': row['pk'], 'team_id': row['team_id'], 'professor_id': row['professor_id']}
+        entries.append(('application.accepted', [*members[row['team_id']], row['professor_id']], event))
+        entries.append(('application.slot_filled', [row['professor_id']], event))
+    for row in plan.withdrawn + waitlisted:
+        event = {'application_id': row['pk'], 'team_id': row['team_id'], 'professor_id': row['professor_id']}
+        entries.append(('application.withdrawn', [row['professor_id']], event))
+    publish_batch(entries)
+    stats.record(deltas)
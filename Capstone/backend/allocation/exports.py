@@ -0,0 +1,213 @@
+"""
+Streaming exports of the team to professor allocation with member rosters.
+
+Rows come from one joined query read with .iterator(), one row per accepted
+team member, and are encoded as they are produced. Nothing is buffered
+beyond a single chunk, so memory stays flat however many teams exist.
+"""
+
+import csv
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.db.models import Value
+from django.db.models.functions import Concat, Trim
+
+from applications.models import Application
+
+FORMATS = ('csv', 'xlsx')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+CHUNK_SIZE = 2000
+
+COLUMNS = (
+    ('application_id', 'pk'),
+    ('status', 'status'),
+    ('team_id', 'team_id'),
+    ('team_name', 'team__name'),
+    ('professor_username', 'professor__user__username'),
+    ('professor_name', 'professor_name'),
+    ('professor_department', 'professor__user__department'),
+    ('team_rank', 'team_rank'),
+    ('professor_rank', 'professor_rank'),
+    ('submitted_at', 'submitted_at'),
+    ('responded_at', 'responded_at'),
+    ('member_username', 'team__members__user__username'),
+    ('member_name', 'member_name'),
+    ('member_email', 'team__members__user__email'),
+    ('member_department', 'team__members__user__department'),
+)
+
+HEADER = [name for name, _ in COLUMNS]
+
+
+def export_queryset(status=None, department=None, allocation_round=None):
+    """
+    Applications joined to their team's accepted members.
+    
+    Filters are the application status, the professor's department and the
+    round whose application window the application was submitted in.
+    """
+    queryset = Application.objects.filter(team__members__status='accepted')
+    if status:
+        queryset = queryset.filter(status=status)
+    if department:
+        queryset = queryset.filter(professor__user__department=department)
+    if allocation_round is not None:
+        opens_at, closes_at = allocation_round.window('applications')
+        if opens_at is None:
+            return queryset.none().values_list(*(field for _, field in COLUMNS))
+        queryset = queryset.filter(submitted_at__gte=opens_at, submitted_at__lt=closes_at)
+
+    return queryset.annotate(
+        professor_name=Trim(Concat(
+            'professor__user__first_name', Value(' '), 'professor__user__last_name'
+        )),
+        member_name=Trim(Concat(
+            'team__members__user__first_name', Value(' '), 'team__members__user__last_name'
+        )),
+    ).order_by('team__name', 'pk', 'team__members__user__username').values_list(
+        *(field for _, field in COLUMNS)
+    )
+
+
+def export_rows(status=None, department=None, allocation_round=None, chunk_size=CHUNK_SIZE):
+    """Yield the header and then one tuple per exported roster line"""
+    yield HEADER
+    yield from export_queryset(status, department, allocation_round).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """Write-only file that hands back whatever is written to it"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    """Encode rows as CSV, one line at a time"""
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow(['' if value is None else _text(value) for value in row]).encode()
+
+
+class _Drain:
+    """Unseekable sink that collects zip output until it is drained"""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Allocation" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+# Characters XML 1.0 does not allow, even escaped
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _text(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ', timespec='seconds')
+    return str(value)
+
+
+def _cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_INVALID_XML.sub('', _text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(rows, flush_every=500):
+    """
+    Encode rows as a single-sheet XLSX workbook.
+
+    The worksheet uses inline strings so no shared-string table has to be
+    held in memory, and the zip is written to an unseekable sink so each
+    compressed block is yielded as soon as it is produced.
+    """
+    sink = _Drain()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            for index, row in enumerate(rows, start=1):
+                sheet.write(f'<row>{"".join(_cell(value) for value in row)}</row>'.encode())
+                if index % flush_every == 0:
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+ENCODERS = {
+    'csv': stream_csv,
+    'xlsx': stream_xlsx,
+}
+
+
+def stream_export(file_format, status=None, department=None, allocation_round=None, chunk_size=CHUNK_SIZE):
+    """Byte chunks of the allocation export in the given format"""
+    return ENCODERS[file_format](export_rows(status, department, allocation_round, chunk_size))
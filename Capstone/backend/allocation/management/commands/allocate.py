@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from allocation.engine import ALGORITHMS, AllocationConflict, allocate
+
+
+class Command(BaseCommand):
+    help = 'Allocate teams to professors from ranked preferences with a stable matching'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithm', choices=ALGORITHMS, default='gale-shapley',
+                            help='gale-shapley for a stable matching, min-cost to minimize total team rank')
+        parser.add_argument('--dry-run', action='store_true', help='Print the changes without writing')
+
+    def handle(self, *args, **options):
+        try:
+            plan = allocate(algorithm=options['algorithm'], dry_run=options['dry_run'])
+        except AllocationConflict as exc:
+            raise CommandError(str(exc))
+
+        if options['dry_run']:
+            for change in plan.diff():
+                sign = '+' if change['to'] == 'accepted' else '-'
+                self.stdout.write(
+                    f"{sign} {change['team_name']} -> {change['professor_name']} "
+                    f"(choice {change['team_rank']}, {change['from']} -> {change['to']})"
+                )
+
+        summary = plan.summary()
+        prefix = 'Would place' if options['dry_run'] else 'Placed'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {summary['teams_placed']} of {summary['teams_considered']} teams "
+            f"with {summary['algorithm']}, filling {summary['slots_filled']} of {summary['slots_available']} "
+            f"free slots (average choice {summary['average_team_rank']})"
+        ))
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from allocation.scheduler import CLOSE_JOBS, close_phase, due_phases, formation_rounds, frozen_before, thaw_teams
+
+
+class Command(BaseCommand):
+    help = ('Run the close-of-phase jobs of allocation rounds whose phases have closed, and thaw teams '
+            'frozen before an open formation window')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the phases that are due')
+        parser.add_argument('--loop', action='store_true', help='Keep checking for due phases until interrupted')
+        parser.add_argument('--interval', type=float, default=60.0,
+                            help='Seconds between checks with --loop')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        try:
+            while True:
+                self.run_due(options['batch_size'], options['dry_run'])
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def run_due(self, batch_size, dry_run):
+        for round_ in formation_rounds():
+            if dry_run:
+                count = frozen_before(round_).count()
+                if count:
+                    self.stdout.write(f'Would thaw {count} teams for formation of {round_.name}')
+                continue
+            thawed = thaw_teams(round_, batch_size)
+            if thawed:
+                self.stdout.write(self.style.SUCCESS(f'Thawed {thawed} teams for formation of {round_.name}'))
+
+        due = due_phases()
+        if not due:
+            self.stdout.write('No phases to close')
+            return
+
+        for round_, phase in due:
+            if dry_run:
+                jobs = ', '.join(label for label, _ in CLOSE_JOBS[phase])
+                self.stdout.write(f'Would close {phase} of {round_.name}: {jobs}')
+                continue
+            results = close_phase(round_, phase, batch_size)
+            summary = ', '.join(f'{count} {label}' for label, count in results.items())
+            self.stdout.write(self.style.SUCCESS(f'Closed {phase} of {round_.name}: {summary}'))
@@ -0,0 +1,48 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from allocation.exports import CHUNK_SIZE, FORMATS, stream_export
+from allocation.models import AllocationRound
+from applications.models import Application
+
+
+class Command(BaseCommand):
+    help = 'Export the team to professor allocation with member rosters as CSV or XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='file_format', choices=FORMATS, default='csv')
+        parser.add_argument('--status', choices=[value for value, _ in Application.STATUS_CHOICES],
+                            help='Only export applications with this status')
+        parser.add_argument('--department', help="Only export applications to this department's professors")
+        parser.add_argument('--round', type=int, dest='round_id',
+                            help='Only export applications submitted in this round, by id')
+        parser.add_argument('--output', '-o', help='File to write, defaults to standard output')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Rows fetched from the database per round trip')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        if options['file_format'] == 'xlsx' and not options['output'] and sys.stdout.isatty():
+            raise CommandError('Refusing to write XLSX to a terminal, use --output')
+
+        allocation_round = None
+        if options['round_id'] is not None:
+            allocation_round = AllocationRound.objects.filter(pk=options['round_id']).first()
+            if allocation_round is None:
+                raise CommandError(f"Allocation round {options['round_id']} not found")
+
+        chunks = stream_export(
+            options['file_format'], status=options['status'], department=options['department'],
+            allocation_round=allocation_round, chunk_size=options['chunk_size'],
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from allocation import stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the allocation statistics counters from the source tables'
+
+    def handle(self, *args, **options):
+        counters = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(counters)} counters'))
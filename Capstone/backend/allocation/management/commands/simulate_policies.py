@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from allocation.simulator import DEFAULT_ROUNDS, load_cohort, simulate_policies, synthesize_cohort
+from teams.models import MAX_TEAM_SIZE
+
+
+def int_list(value):
+    return [int(part) for part in value.split(',') if part.strip()]
+
+
+class Command(BaseCommand):
+    help = 'Monte Carlo comparison of application cap, team size and professor slot policies'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-pending', type=int_list, default=[4],
+                            help='Comma-separated caps on pending applications per team')
+        parser.add_argument('--team-size', type=int_list, default=[MAX_TEAM_SIZE],
+                            help='Comma-separated team sizes')
+        parser.add_argument('--total-slots', type=int_list, default=[5],
+                            help='Comma-separated slots per professor')
+        parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--students', type=int, help='Synthesize a cohort of this many students')
+        parser.add_argument('--professors', type=int, default=50, help='Professors in a synthetic cohort')
+        parser.add_argument('--skew', type=float, default=1.0,
+                            help='Zipf exponent of professor popularity in a synthetic cohort')
+
+    def handle(self, *args, **options):
+        try:
+            if options['students']:
+                cohort = synthesize_cohort(options['students'], options['professors'], options['skew'])
+            else:
+                cohort = load_cohort()
+            results = simulate_policies(
+                cohort,
+                options['max_pending'],
+                options['team_size'],
+                options['total_slots'],
+                rounds=options['rounds'],
+                seed=options['seed'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(
+            f"{cohort.students} students, {cohort.professors} professors, {options['rounds']} rounds per policy"
+        )
+        self.stdout.write(f"{'pending':>7} {'size':>4} {'slots':>5} {'teams':>6} {'unplaced':>9} "
+                          f"{'p95':>7} {'avg rank':>8} {'slot use':>8}")
+        for result in results:
+            self.stdout.write(
+                f"{result['max_pending']:>7} {result['team_size']:>4} {result['total_slots']:>5} "
+                f"{result['teams']:>6} {result['unplaced_rate']:>9.1%} {result['unplaced_rate_p95']:>7.1%} "
+                f"{result['average_rank']:>8.2f} "
+                f"{result['slot_utilization']:>8.1%}"
+            )
@@ -0,0 +1,154 @@
+"""
+In-memory matching algorithms for allocating teams to professors.
+
+Both take proposals, a dict mapping each team to the professors it applied
+to in preference order, and capacity, a dict of free slots per professor,
+and return a dict mapping placed teams to their professor.
+"""
+
+from collections import defaultdict, deque
+from heapq import heappop, heappush, heapreplace
+
+INF = float('inf')
+
+
+def gale_shapley(proposals, priority, capacity):
+    """
+    Team-proposing deferred acceptance with professor capacities.
+
+    priority maps (team, professor) to the professor's position for that team,
+    lower being preferred. The result is stable and the best stable outcome
+    for every team.
+    """
+    next_choice = dict.fromkeys(proposals, 0)
+    # Per professor, a max-heap on position so the weakest held team is on top
+    held = defaultdict(list)
+    free = deque(proposals)
+
+    while free:
+        team = free.popleft()
+        choices = proposals[team]
+        index = next_choice[team]
+        if index >= len(choices):
+            continue
+        next_choice[team] = index + 1
+        professor = choices[index]
+
+        seats = capacity.get(professor, 0)
+        position = priority[team, professor]
+        heap = held[professor]
+        if len(heap) < seats:
+            heappush(heap, (-position, team))
+        elif heap and -heap[0][0] > position:
+            _, rejected = heapreplace(heap, (-position, team))
+            free.append(rejected)
+        else:
+            free.append(team)
+
+    return {team: professor for professor, heap in held.items() for _, team in heap}
+
+
+def min_cost_assignment(proposals, capacity):
+    """
+    Place as many teams as possible, then minimize the sum of the ranks teams
+    gave their professor. Professor preferences are ignored.
+
+    Primal-dual min-cost flow on source -> team -> professor -> sink: one
+    Dijkstra per phase updates the potentials, then every augmenting path of
+    zero reduced cost is pushed before the next phase.
+    """
+    teams = list(proposals)
+    professors = sorted({p for choices in proposals.values() for p in choices if capacity.get(p, 0) > 0})
+    source, sink = 0, 1
+    team_node = {team: 2 + index for index, team in enumerate(teams)}
+    professor_node = {p: 2 + len(teams) + index for index, p in enumerate(professors)}
+    size = 2 + len(teams) + len(professors)
+
+    graph = [[] for _ in range(size)]
+    head, cap, cost = [], [], []
+
+    def add_edge(u, v, edge_cap, edge_cost):
+        # Edge e and its residual twin e ^ 1 are stored side by side
+        for a, b, c, w in ((u, v, edge_cap, edge_cost), (v, u, 0, -edge_cost)):
+            graph[a].append(len(head))
+            head.append(b)
+            cap.append(c)
+            cost.append(w)
+
+    team_edges = {}
+    for team in teams:
+        add_edge(source, team_node[team], 1, 0)
+        for rank, professor in enumerate(proposals[team], 1):
+            if professor in professor_node:
+                team_edges[len(head)] = (team, professor)
+                add_edge(team_node[team], professor_node[professor], 1, rank)
+    for professor in professors:
+        add_edge(professor_node[professor], sink, capacity[professor], 0)
+
+    # Every cost starts non-negative, so zero potentials are feasible
+    potential = [0] * size
+    while True:
+        dist = [INF] * size
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, u = heappop(heap)
+            if d > dist[u]:
+                continue
+            for edge in graph[u]:
+                if cap[edge] > 0:
+                    v = head[edge]
+                    nd = d + cost[edge] + potential[u] - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        heappush(heap, (nd, v))
+        if dist[sink] == INF:
+            break
+        for node in range(size):
+            if dist[node] < INF:
+                potential[node] += dist[node]
+
+        pointer = [0] * size
+        dead = [False] * size
+        while _augment(graph, head, cap, cost, potential, pointer, dead, source, sink):
+            pass
+
+    return {
+        team: professor
+        for edge, (team, professor) in team_edges.items()
+        if cap[edge] == 0
+    }
+
+
+def _augment(graph, head, cap, cost, potential, pointer, dead, source, sink):
+    """Push one unit along a path of zero reduced cost; False when none is left this phase"""
+    stack, edges, on_stack = [source], [], {source}
+    while stack:
+        u = stack[-1]
+        if u == sink:
+            for edge in edges:
+                cap[edge] -= 1
+                cap[edge ^ 1] += 1
+            return True
+
+        arcs = graph[u]
+        while pointer[u] < len(arcs):
+            edge = arcs[pointer[u]]
+            v = head[edge]
+            if (cap[edge] > 0 and not dead[v] and v not in on_stack
+                    and cost[edge] + potential[u] - potential[v] == 0):
+                break
+            pointer[u] += 1
+        else:
+            # Nothing admissible leaves u for the rest of this phase
+            dead[u] = True
+            on_stack.discard(stack.pop())
+            if edges:
+                edges.pop()
+                pointer[stack[-1]] += 1
+            continue
+
+        stack.append(v)
+        edges.append(edge)
+        on_stack.add(v)
+    return False
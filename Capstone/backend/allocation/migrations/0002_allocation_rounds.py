@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('allocation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AllocationRound',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('formation_opens_at', models.DateTimeField(blank=True, null=True)),
+                ('formation_closes_at', models.DateTimeField(blank=True, null=True)),
+                ('applications_opens_at', models.DateTimeField(blank=True, null=True)),
+                ('applications_closes_at', models.DateTimeField(blank=True, null=True)),
+                ('decisions_opens_at', models.DateTimeField(blank=True, null=True)),
+                ('decisions_closes_at', models.DateTimeField(blank=True, null=True)),
+                ('formation_closed_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('applications_closed_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('decisions_closed_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Allocation Round',
+                'verbose_name_plural': 'Allocation Rounds',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
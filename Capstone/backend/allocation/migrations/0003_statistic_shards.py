@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:05
+
+from django.db import migrations, models
+
+
+def copy_counters(apps, schema_editor):
+    LegacyStatistic = apps.get_model('allocation', 'LegacyStatistic')
+    Statistic = apps.get_model('allocation', 'Statistic')
+    Statistic.objects.bulk_create(
+        [Statistic(key=key, shard=0, value=value) for key, value in LegacyStatistic.objects.values_list('key', 'value')],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('allocation', '0002_allocation_rounds'),
+    ]
+
+    operations = [
+        # Counters move to a table keyed by (key, shard); the old rows become shard 0
+        migrations.RenameModel('Statistic', 'LegacyStatistic'),
+        migrations.CreateModel(
+            name='Statistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=150)),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Statistic',
+                'verbose_name_plural': 'Statistics',
+                'ordering': ['key', 'shard'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='statistic',
+            constraint=models.UniqueConstraint(fields=('key', 'shard'), name='statistic_key_shard_uniq'),
+        ),
+        migrations.RunPython(copy_counters, migrations.RunPython.noop),
+        migrations.DeleteModel('LegacyStatistic'),
+    ]
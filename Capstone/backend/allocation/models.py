@@ -0,0 +1,72 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+
+
+class Statistic(models.Model):
+    """
+    One shard of an allocation counter kept in step with the rows it counts.
+
+    Keys are colon-separated: 'applications:<status>',
+    'applications:<status>:<department>', 'slots:total', 'slots:filled',
+    'teams:total' and 'teams:placed'. The department comes last so it may
+    itself contain colons. A counter's value is the sum of its shards.
+    """
+    
+    key = models.CharField(max_length=150)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Statistic'
+        verbose_name_plural = 'Statistics'
+        ordering = ['key', 'shard']
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'shard'], name='statistic_key_shard_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.key}[{self.shard}] = {self.value}"
+
+
+class AllocationRound(models.Model):
+    """
+    One allocation round with an open and close time per phase.
+    
+    Phases are team formation, application submission and professor
+    decisions. A phase left blank is not part of the round. The *_closed_at
+    fields record when close_phases ran that phase's close-of-phase jobs.
+    """
+    
+    PHASES = ('formation', 'applications', 'decisions')
+    
+    name = models.CharField(max_length=100, unique=True)
+    formation_opens_at = models.DateTimeField(null=True, blank=True)
+    formation_closes_at = models.DateTimeField(null=True, blank=True)
+    applications_opens_at = models.DateTimeField(null=True, blank=True)
+    applications_closes_at = models.DateTimeField(null=True, blank=True)
+    decisions_opens_at = models.DateTimeField(null=True, blank=True)
+    decisions_closes_at = models.DateTimeField(null=True, blank=True)
+    formation_closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    applications_closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    decisions_closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Allocation Round'
+        verbose_name_plural = 'Allocation Rounds'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return self.name
+    
+    def window(self, phase):
+        """(opens_at, closes_at) of a phase"""
+        return getattr(self, f'{phase}_opens_at'), getattr(self, f'{phase}_closes_at')
+    
+    def clean(self):
+        for phase in self.PHASES:
+            opens_at, closes_at = self.window(phase)
+            if (opens_at is None) != (closes_at is None):
+                raise ValidationError(f"Set both the open and close time of the {phase} phase, or neither")
+            if opens_at is not None and opens_at >= closes_at:
+                raise ValidationError(f"The {phase} phase must open before it closes")
@@ -0,0 +1,109 @@
+"""
+Phase windows of allocation rounds, served from process memory.
+
+Every worker keeps the round schedule and compares it against a shared
+version number in the cache, so checking whether a phase is open costs one
+cache read instead of a query. Saving or deleting a round bumps the version.
+When the cache is local to each process those bumps never reach the other
+workers, so the schedule is read from the database on every check instead.
+With no rounds defined every phase is open.
+"""
+
+import threading
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from project_allocation.cache import bump_on_commit, get_version, is_shared
+from .models import AllocationRound
+
+VERSION_CACHE_KEY = 'allocation:rounds:version'
+
+PHASE_LABELS = {
+    'formation': 'Team formation',
+    'applications': 'Application submission',
+    'decisions': 'Application decisions',
+}
+
+_lock = threading.Lock()
+_schedule = None
+
+
+class PhaseClosed(APIException):
+    """Raised when a request falls outside the open window of its phase"""
+    status_code = status.HTTP_403_FORBIDDEN
+    default_detail = 'This phase of the allocation round is closed.'
+    default_code = 'phase_closed'
+
+
+def current_version():
+    """Return the shared schedule version"""
+    return get_version(VERSION_CACHE_KEY)
+
+
+def invalidate():
+    """Mark every worker's schedule stale once the current transaction commits"""
+    bump_on_commit(VERSION_CACHE_KEY)
+
+
+class Schedule:
+    """Open windows of every phase across all rounds"""
+
+    def __init__(self, version, rounds):
+        self.version = version
+        self.has_rounds = bool(rounds)
+        self.windows = {
+            phase: [
+                window for window in (round_.window(phase) for round_ in rounds)
+                if window[0] is not None
+            ]
+            for phase in AllocationRound.PHASES
+        }
+
+    @classmethod
+    def build(cls, version):
+        return cls(version, list(AllocationRound.objects.all()))
+
+    def is_open(self, phase, now=None):
+        if not self.has_rounds:
+            return True
+        now = now or timezone.now()
+        return any(opens_at <= now < closes_at for opens_at, closes_at in self.windows[phase])
+
+
+def get_schedule():
+    """Return this worker's schedule, rebuilding it if the shared version moved"""
+    global _schedule
+    if not is_shared():
+        return Schedule.build(None)
+    version = current_version()
+    schedule = _schedule
+    if schedule is not None and schedule.version == version:
+        return schedule
+
+    with _lock:
+        if _schedule is None or _schedule.version != version:
+            _schedule = Schedule.build(version)
+        return _schedule
+
+
+def phase_open(phase, now=None):
+    return get_schedule().is_open(phase, now)
+
+
+def require_phase(phase):
+    """Raise PhaseClosed unless phase is open in some round right now"""
+    if not phase_open(phase):
+        raise PhaseClosed(f'{PHASE_LABELS[phase]} is closed for the current allocation round.')
+
+
+class PhaseMixin:
+    """View mixin that refuses requests, except from admins, while the view's phase is closed"""
+
+    phase = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.user.role != 'admin':
+            require_phase(self.phase)
@@ -0,0 +1,135 @@
+"""
+Close-of-phase jobs for allocation rounds.
+
+Closing formation freezes every team; when a later round opens its
+formation window, teams frozen before it opened are thawed again.
+
+Each job is a chunked, set-based pass: ids are read in batches and every
+batch is written in its own short transaction with the job's filter
+re-applied, so rows changed by live traffic in the meantime are left alone
+and no lock is held for longer than one batch.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from applications.intake import process_batch
+from applications.models import OPEN_STATUSES, Application, ApplicationSubmission
+from events.broker import publish_batch
+from project_allocation.batches import in_batches
+from teams.models import Team, TeamMember
+from . import stats
+from .models import AllocationRound
+
+
+def due_phases(now=None):
+    """(round, phase) pairs whose close time has passed and whose jobs have not run"""
+    now = now or timezone.now()
+    condition = Q()
+    for phase in AllocationRound.PHASES:
+        condition |= Q(**{f'{phase}_closes_at__lte': now, f'{phase}_closed_at__isnull': True})
+    due = []
+    for round_ in AllocationRound.objects.filter(condition).order_by('pk'):
+        for phase in AllocationRound.PHASES:
+            closes_at = getattr(round_, f'{phase}_closes_at')
+            if closes_at is not None and closes_at <= now and getattr(round_, f'{phase}_closed_at') is None:
+                due.append((round_, phase))
+    return due
+
+
+def expire_invitations(batch_size):
+    return in_batches(TeamMember.objects.filter(status='pending'), batch_size, lambda rows: rows.expire())
+
+
+def freeze_teams(batch_size):
+    now = timezone.now()
+    return in_batches(
+        Team.objects.filter(frozen_at__isnull=True), batch_size,
+        lambda rows: rows.update(frozen_at=now)
+    )
+
+
+def formation_rounds(now=None):
+    """Rounds whose formation window is open right now"""
+    now = now or timezone.now()
+    return list(
+        AllocationRound.objects.filter(formation_opens_at__lte=now, formation_closes_at__gt=now).order_by('pk')
+    )
+
+
+def frozen_before(round_):
+    """Teams frozen before the round's formation window opened, by an earlier round or by hand"""
+    return Team.objects.filter(frozen_at__lt=round_.formation_opens_at)
+
+
+def thaw_teams(round_, batch_size):
+    """Let teams frozen by an earlier round change members again during this round's formation"""
+    return in_batches(frozen_before(round_), batch_size, lambda rows: rows.update(frozen_at=None))
+
+
+def drain_submissions(batch_size):
+    """Create every application that was queued before submissions closed"""
+    total = 0
+    while ApplicationSubmission.objects.filter(status='queued').exists():
+        total += sum(process_batch(batch_size).values())
+    return total
+
+
+def _withdraw(rows):
+    """Withdraw one locked batch of open applications with their events and counters"""
+    now = timezone.now()
+    found = list(
+        rows.select_for_update(of=('self',)).values(
+            'pk', 'team_id', 'professor_id', 'status', department=F('professor__user__department')
+        )
+    )
+    if not found:
+        return 0
+    Application.objects.filter(pk__in=[row['pk'] for row in found]).update(status='withdrawn', responded_at=now)
+
+    members = defaultdict(list)
+    for team_id, user_id in TeamMember.objects.filter(
+        team_id__in={row['team_id'] for row in found}, status='accepted'
+    ).values_list('team_id', 'user_id'):
+        members[team_id].append(user_id)
+
+    deltas = Counter()
+    entries = []
+    for row in found:
+        deltas.update(stats.transition_deltas(row['status'], 'withdrawn', row['department']))
+        event = {'application_id': row['pk'], 'team_id': row['team_id'], 'professor_id': row['professor_id']}
+        entries.append(('application.withdrawn', [*members[row['team_id']], row['professor_id']], event))
+    publish_batch(entries)
+    stats.record(deltas)
+    return len(found)
+
+
+def withdraw_stale_applications(batch_size):
+    """Withdraw applications still pending or waitlisted once decisions close"""
+    return in_batches(Application.objects.filter(status__in=OPEN_STATUSES), batch_size, _withdraw)
+
+
+# Jobs run when each phase closes, as (label, job) in order
+CLOSE_JOBS = {
+    'formation': [
+        ('invitations expired', expire_invitations),
+        ('teams frozen', freeze_teams),
+    ],
+    'applications': [
+        ('queued submissions processed', drain_submissions),
+    ],
+    'decisions': [
+        ('stale applications withdrawn', withdraw_stale_applications),
+    ],
+}
+
+
+def close_phase(round_, phase, batch_size):
+    """Run a phase's close jobs and record that they ran; returns {label: rows}"""
+    results = {label: job(batch_size) for label, job in CLOSE_JOBS[phase]}
+    AllocationRound.objects.filter(pk=round_.pk, **{f'{phase}_closed_at__isnull': True}).update(
+        **{f'{phase}_closed_at': timezone.now()}
+    )
+    return results
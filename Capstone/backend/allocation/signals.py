@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from applications.models import Application
+from teams.models import Team
+from users.models import ProfessorProfile
+from . import rounds, stats
+from .models import AllocationRound
+
+
+@receiver(post_save, sender=Team)
+def count_created_team(sender, instance, created, **kwargs):
+    if created:
+        stats.record({'teams:total': 1})
+
+
+@receiver(post_delete, sender=Team)
+def count_deleted_team(sender, instance, **kwargs):
+    stats.record({'teams:total': -1})
+
+
+@receiver(post_save, sender=Application)
+def count_created_application(sender, instance, created, **kwargs):
+    # Later status changes are recorded by Application.decide() and save()
+    if created:
+        stats.record(stats.transition_deltas(None, instance.status, stats.professor_department(instance.professor_id)))
+
+
+@receiver(post_delete, sender=Application)
+def count_deleted_application(sender, instance, **kwargs):
+    deltas = stats.transition_deltas(instance.status, None, stats.professor_department(instance.professor_id))
+    if instance.status == 'accepted':
+        deltas['teams:placed'] -= 1
+    stats.record(deltas)
+
+
+@receiver(post_save, sender=ProfessorProfile)
+def count_professor_slots(sender, instance, created, **kwargs):
+    """Slot totals follow saved profiles; reservations are recorded where they happen"""
+    total, filled = (0, 0) if created else getattr(instance, '_loaded_slots', (instance.total_slots, instance.filled_slots))
+    stats.record({'slots:total': instance.total_slots - total, 'slots:filled': instance.filled_slots - filled})
+    instance._loaded_slots = (instance.total_slots, instance.filled_slots)
+
+
+@receiver(post_delete, sender=ProfessorProfile)
+def count_deleted_professor(sender, instance, **kwargs):
+    stats.record({'slots:total': -instance.total_slots, 'slots:filled': -instance.filled_slots})
+
+
+@receiver(post_save, sender=AllocationRound)
+@receiver(post_delete, sender=AllocationRound)
+def refresh_round_schedule(sender, **kwargs):
+    rounds.invalidate()
@@ -0,0 +1,123 @@
+"""
+Monte Carlo simulator for allocation policy constants.
+
+A policy is the cap on pending applications per team, the team size and the
+number of slots per professor. Each simulated round forms teams from the
+cohort, lets every team apply to distinct professors drawn by popularity,
+and allocates them. Professors are assumed to share one priority order over
+teams, so the stable matching is a serial dictatorship: teams in priority
+order take their best choice that still has a slot. All rounds of a batch
+advance together as NumPy arrays.
+"""
+
+import math
+from itertools import product
+
+import numpy as np
+from django.db.models import Count
+
+DEFAULT_ROUNDS = 2000
+
+# Rounds simulated together; bounds memory at batch x teams x choices
+BATCH_ROUNDS = 1000
+
+
+class Cohort:
+    """Student count and per-professor popularity weights"""
+
+    def __init__(self, students, popularity):
+        self.students = students
+        popularity = np.asarray(popularity, dtype=float)
+        self.cdf = np.cumsum(popularity / popularity.sum())
+
+    @property
+    def professors(self):
+        return len(self.cdf)
+
+
+def load_cohort():
+    """Current students, with professor popularity taken from the applications they received"""
+    from users.models import User, ProfessorProfile
+
+    received = ProfessorProfile.objects.annotate(received=Count('applications')).values_list('received', flat=True)
+    # Add-one smoothing so professors nobody applied to yet can still be drawn
+    popularity = [count + 1 for count in received]
+    if not popularity:
+        raise ValueError('There are no professors to simulate against')
+    return Cohort(User.objects.filter(role='student').count(), popularity)
+
+
+def synthesize_cohort(students, professors, skew=1.0):
+    """Synthetic cohort whose professor popularity follows a Zipf law with exponent skew"""
+    return Cohort(students, 1.0 / np.arange(1, professors + 1) ** skew)
+
+
+def _draw_choices(rng, cohort, shape, choices):
+    """Distinct professors per team in preference order, drawn by popularity"""
+    picks = np.empty((math.prod(shape), choices), dtype=np.int32)
+    for column in range(choices):
+        todo = np.arange(len(picks))
+        while todo.size:
+            draw = np.searchsorted(cohort.cdf, rng.random(todo.size), side='right')
+            picks[todo, column] = np.minimum(draw, cohort.professors - 1)
+            # Redraw only the teams that picked someone they already chose
+            todo = todo[(picks[todo, :column] == picks[todo, column, None]).any(axis=1)]
+    return picks.reshape(shape + (choices,))
+
+
+def _simulate_batch(rng, cohort, teams, choices, slots, rounds):
+    picks = _draw_choices(rng, cohort, (rounds, teams), choices)
+    # Flat (round, professor) indices keep the per-team step to a few take/put calls
+    picks += (np.arange(rounds, dtype=np.int32) * cohort.professors)[:, None, None]
+    remaining = np.full(rounds * cohort.professors, slots, dtype=np.int32)
+    obtained = np.zeros((rounds, teams), dtype=np.int32)
+    rows = np.arange(rounds)
+
+    # Choices are i.i.d. across teams, so index order is a random priority order
+    for team in range(teams):
+        wanted = picks[:, team, :]
+        open_ = remaining[wanted] > 0
+        rank = open_.argmax(axis=1)
+        placed = open_[rows, rank]
+        remaining[wanted[rows, rank][placed]] -= 1
+        obtained[:, team] = np.where(placed, rank + 1, 0)
+    return obtained
+
+
+def simulate(cohort, max_pending, team_size, total_slots, rounds=DEFAULT_ROUNDS, seed=None):
+    """Run rounds of one policy and summarize unplaced teams, rank obtained and slot use"""
+    rng = np.random.default_rng(seed)
+    teams = math.ceil(cohort.students / team_size)
+    if not teams:
+        raise ValueError('There are no students to simulate')
+    choices = min(max_pending, cohort.professors)
+    capacity = cohort.professors * total_slots
+
+    unplaced, ranks, utilization = [], [], []
+    for start in range(0, rounds, BATCH_ROUNDS):
+        obtained = _simulate_batch(rng, cohort, teams, choices, total_slots, min(BATCH_ROUNDS, rounds - start))
+        placed = (obtained > 0).sum(axis=1)
+        unplaced.append(1 - placed / teams)
+        utilization.append(placed / capacity)
+        with np.errstate(invalid='ignore'):
+            ranks.append(obtained.sum(axis=1) / placed)
+
+    unplaced, ranks, utilization = (np.concatenate(values) for values in (unplaced, ranks, utilization))
+    return {
+        'max_pending': max_pending,
+        'team_size': team_size,
+        'total_slots': total_slots,
+        'teams': teams,
+        'unplaced_rate': float(unplaced.mean()),
+        'unplaced_rate_p95': float(np.percentile(unplaced, 95, method='higher')),
+        'average_rank': float(np.nanmean(ranks)),
+        'slot_utilization': float(utilization.mean()),
+    }
+
+
+def simulate_policies(cohort, max_pending, team_sizes, total_slots, rounds=DEFAULT_ROUNDS, seed=None):
+    """Simulate every combination of the given policy values"""
+    return [
+        simulate(cohort, pending, size, slots, rounds=rounds, seed=seed)
+        for pending, size, slots in product(max_pending, team_sizes, total_slots)
+    ]
@@ -0,0 +1,139 @@
+"""
+Allocation statistics maintained incrementally.
+
+Every write that changes an application status, a team or professor slots
+also applies the matching counter deltas in the same transaction, so the
+admin overview is a read of one small table. Each counter is split over
+STATISTIC_SHARDS rows and every thread writes to its own shard, so
+concurrent status changes do not all queue on one hot row; reads sum the
+shards. rebuild() recomputes every counter from scratch with set-based
+queries.
+"""
+
+import random
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, Exists, F, OuterRef, Sum, Value, When
+
+from .models import Statistic
+
+_local = threading.local()
+
+
+def professor_department(professor_id):
+    """Department of a professor; profiles share their primary key with the user"""
+    from users.models import User
+
+    return User.objects.filter(pk=professor_id).values_list('department', flat=True).first()
+
+
+def application_keys(status, department):
+    return [f'applications:{status}', f'applications:{status}:{department or ""}']
+
+
+def transition_deltas(old_status, new_status, department, count=1):
+    """Counter deltas for count applications of one department moving between statuses"""
+    deltas = Counter()
+    if old_status:
+        for key in application_keys(old_status, department):
+            deltas[key] -= count
+    if new_status:
+        for key in application_keys(new_status, department):
+            deltas[key] += count
+    return deltas
+
+
+def _shard():
+    """This thread's shard, picked once so each transaction only ever writes to one"""
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = random.randrange(max(settings.STATISTIC_SHARDS, 1))
+    return shard
+
+
+def record(deltas):
+    """Apply counter deltas to this thread's shard with a single UPDATE inside the current transaction"""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    shard = _shard()
+    Statistic.objects.bulk_create([Statistic(key=key, shard=shard) for key in deltas], ignore_conflicts=True)
+    rows = Statistic.objects.filter(key__in=deltas, shard=shard)
+    # An UPDATE ... IN (...) locks rows in no defined order, so take the locks
+    # in key order first; writers sharing a shard then cannot deadlock here
+    list(rows.select_for_update().order_by('key').values_list('pk', flat=True))
+    rows.update(value=F('value') + Case(
+        *[When(key=key, then=Value(delta)) for key, delta in deltas.items()],
+        default=Value(0),
+    ))
+
+
+def snapshot():
+    """Every counter, shaped for the admin overview"""
+    overview = {
+        'applications': {'by_status': {}, 'by_department': defaultdict(dict)},
+        'slots': {'total': 0, 'filled': 0},
+        'teams': {'total': 0, 'placed': 0},
+    }
+    totals = Statistic.objects.order_by().values('key').annotate(total=Sum('value')).values_list('key', 'total')
+    for key, value in totals:
+        parts = key.split(':', 2)
+        if parts[0] == 'applications' and len(parts) == 2:
+            overview['applications']['by_status'][parts[1]] = value
+        elif parts[0] == 'applications':
+            overview['applications']['by_department'][parts[2] or 'Unassigned'][parts[1]] = value
+        elif parts[0] in ('slots', 'teams') and len(parts) == 2:
+            overview[parts[0]][parts[1]] = value
+
+    slots, teams = overview['slots'], overview['teams']
+    slots['available'] = slots['total'] - slots['filled']
+    teams['unplaced'] = teams['total'] - teams['placed']
+    return overview
+
+
+def rebuild():
+    """
+    Recompute every counter from the source tables.
+
+    Existing shards are locked before the reads, zeroed and the totals
+    written to shard 0. Writers record their deltas last in their
+    transactions, so each one either committed before the reads or waits
+    and applies its delta on top of the rebuilt value. Shards are zeroed
+    rather than deleted so a waiting writer still finds its row.
+    """
+    with transaction.atomic():
+        list(Statistic.objects.select_for_update().order_by('key', 'shard').values_list('pk', flat=True))
+        values = _recount()
+        Statistic.objects.update(value=0)
+        Statistic.objects.bulk_create(
+            [Statistic(key=key, shard=0, value=value) for key, value in values.items()],
+            update_conflicts=True, unique_fields=['key', 'shard'], update_fields=['value'],
+        )
+    return values
+
+
+def _recount():
+    """Every counter's value computed from the source tables"""
+    from applications.models import Application
+    from teams.models import Team
+    from users.models import ProfessorProfile
+
+    deltas = Counter()
+    for row in Application.objects.values('status', 'professor__user__department').annotate(count=Count('pk')):
+        deltas.update(transition_deltas(None, row['status'], row['professor__user__department'], row['count']))
+
+    slots = ProfessorProfile.objects.aggregate(total=Sum('total_slots'), filled=Sum('filled_slots'))
+    deltas['slots:total'] = slots['total'] or 0
+    deltas['slots:filled'] = slots['filled'] or 0
+
+    teams = Team.objects.aggregate(
+        total=Count('pk'),
+        placed=Count('pk', filter=Exists(Application.objects.filter(team=OuterRef('pk'), status='accepted'))),
+    )
+    deltas['teams:total'] = teams['total']
+    deltas['teams:placed'] = teams['placed']
+    return deltas
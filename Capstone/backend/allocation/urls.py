@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'allocation'
+
+urlpatterns = [
+    path('allocation/run/', views.run_allocation, name='allocation-run'),
+    path('stats/', views.allocation_stats, name='allocation-stats'),
+    path('rounds/phases/', views.current_phases, name='round-phases'),
+    path('exports/allocation.<str:file_format>', views.export_allocations, name='allocation-export'),
+]
@@ -0,0 +1,86 @@
+from django.http import StreamingHttpResponse
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from applications.models import Application
+from project_allocation.exceptions import Conflict
+from . import rounds, stats
+from .engine import ALGORITHMS, AllocationConflict, allocate
+from .exports import CONTENT_TYPES, FORMATS, stream_export
+from .models import AllocationRound
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def run_allocation(request):
+    """Allocate teams to professors from ranked preferences (admin only)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    algorithm = request.data.get('algorithm', 'gale-shapley')
+    if algorithm not in ALGORITHMS:
+        return Response(
+            {'error': f"Algorithm must be one of: {', '.join(ALGORITHMS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('true', '1')
+    try:
+        plan = allocate(algorithm=algorithm, dry_run=dry_run)
+    except AllocationConflict as exc:
+        raise Conflict(str(exc))
+    
+    return Response(plan.as_dict() if dry_run else plan.summary())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def allocation_stats(request):
+    """Allocation progress for the admin overview, read from maintained counters (admin only)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    return Response(stats.snapshot())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_allocations(request, file_format):
+    """Stream the allocation with member rosters as CSV or XLSX (admin only)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    if file_format not in FORMATS:
+        return Response(
+            {'error': f"Format must be one of: {', '.join(FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    application_status = request.query_params.get('status')
+    if application_status and application_status not in dict(Application.STATUS_CHOICES):
+        return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    allocation_round = None
+    round_id = request.query_params.get('round')
+    if round_id:
+        allocation_round = AllocationRound.objects.filter(pk=round_id).first() if round_id.isdigit() else None
+        if allocation_round is None:
+            return Response({'error': 'Allocation round not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    response = StreamingHttpResponse(
+        stream_export(
+            file_format, status=application_status, department=request.query_params.get('department'),
+            allocation_round=allocation_round
+        ),
+        content_type=CONTENT_TYPES[file_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="allocation.{file_format}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def current_phases(request):
+    """Which phases of the allocation round are open right now, from the cached schedule"""
+    return Response({phase: rounds.phase_open(phase) for phase in AllocationRound.PHASES})
@@ -1,5 +1,7 @@
-from django.contrib import admin
-from .models import Application
+from django.contrib import admin, messages
+from django.http import HttpResponseRedirect
+
+from .models import Application, DecisionConflict
 
 
 @admin.register(Application)
@@ -19,4 +21,21 @@ class ApplicationAdmin(admin.ModelAdmin):
         ('Timestamps', {
             'fields': ('submitted_at', 'responded_at')
         }),
-    ) 
\ No newline at end of file
+    )
+    
+    def save_model(self, request, obj, form, change):
+        # clean() catches most failed accepts; this covers races with live decisions
+        try:
+            super().save_model(request, obj, form, change)
+        except DecisionConflict as exc:
+            request.decision_conflict = True
+            self.message_user(request, str(exc), messages.ERROR)
+    
+    def save_related(self, request, form, formsets, change):
+        if not getattr(request, 'decision_conflict', False):
+            super().save_related(request, form, formsets, change)
+    
+    def response_change(self, request, obj):
+        if getattr(request, 'decision_conflict', False):
+            return HttpResponseRedirect(request.path)
+        return super().response_change(request, obj) 
\ No newline at end of file
@@ -3,5 +3,7 @@ from django.apps import AppConfig
 
 class ApplicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'applications' 
- 
\ No newline at end of file
+    name = 'applications'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,144 @@
+"""
+Bulk accept, reject and waitlist decisions for open applications.
+
+A batch is applied in one transaction: the affected teams and applications
+are locked once, the professors' slots are taken with one guarded UPDATE per
+professor, and the decisions, sibling withdrawals, events and counters are
+written with set-based statements instead of one round of each per item.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, F, TextField, Value, When
+from django.utils import timezone
+
+from allocation import stats
+from events.broker import publish_batch
+from teams.models import Team, TeamMember
+from users.models import ProfessorProfile
+from .models import OPEN_STATUSES, Application, DecisionConflict
+
+
+def _take_slots(taken):
+    """Reserve count slots for each professor or raise DecisionConflict naming the shortfall"""
+    short = ProfessorProfile.objects.fill_slots(taken)
+    if short:
+        professor_id = short[0]
+        count = taken[professor_id]
+        free = ProfessorProfile.objects.filter(pk=professor_id).values_list(
+            F('total_slots') - F('filled_slots'), flat=True
+        ).first() or 0
+        raise DecisionConflict(
+            f'Accepting {count} applications needs {count} slots but only {max(free, 0)} are available'
+        )
+
+
+def decide_bulk(queryset, decisions):
+    """
+    Apply many decisions to the open applications in queryset.
+
+    decisions is a list of dicts with application_id, status ('accepted',
+    'rejected' or 'waitlisted') and an optional professor_response. Items that
+    are not pending or waitlisted in queryset, or already have the requested
+    status, are reported and skipped. A shortfall of slots for any professor
+    fails the whole batch with DecisionConflict. Returns one result dict per
+    item in request order.
+    """
+    by_pk = {item['application_id']: item for item in decisions}
+    now = timezone.now()
+
+    try:
+        with transaction.atomic():
+            accepting = [pk for pk, item in by_pk.items() if item['status'] == 'accepted']
+            Team.objects.lock(queryset.filter(pk__in=accepting).values_list('team_id', flat=True))
+
+            locked = queryset.select_for_update(of=('self',)).filter(
+                pk__in=list(by_pk), status__in=OPEN_STATUSES
+            ).order_by('pk').values('pk', 'team_id', 'professor_id', 'status', 'professor__user__department')
+            unchanged = set()
+            rows = {}
+            for row in locked:
+                if row['status'] == by_pk[row['pk']]['status']:
+                    unchanged.add(row['pk'])
+                else:
+                    rows[row['pk']] = row
+            accepted = [pk for pk in accepting if pk in rows]
+            rejected = [pk for pk, item in by_pk.items() if item['status'] == 'rejected' and pk in rows]
+            waitlisted = [pk for pk, item in by_pk.items() if item['status'] == 'waitlisted' and pk in rows]
+
+            _take_slots(Counter(rows[pk]['professor_id'] for pk in accepted))
+
+            fields = {
+                'status': Case(
+                    When(pk__in=accepted, then=Value('accepted')),
+                    When(pk__in=waitlisted, then=Value('waitlisted')),
+                    default=Value('rejected'),
+                    output_field=CharField(),
+                ),
+                'responded_at': now,
+            }
+            responses = [
+                When(pk=pk, then=Value(by_pk[pk]['professor_response']))
+                for pk in rows if 'professor_response' in by_pk[pk]
+            ]
+            if responses:
+                fields['professor_response'] = Case(
+                    *responses, default=F('professor_response'), output_field=TextField()
+                )
+            Application.objects.filter(pk__in=list(rows)).update(**fields)
+
+            # A team's other open applications are withdrawn once it is accepted
+            accepted_teams = [rows[pk]['team_id'] for pk in accepted]
+            siblings = list(
+                Application.objects.filter(team_id__in=accepted_teams, status__in=OPEN_STATUSES).values(
+                    'pk', 'team_id', 'professor_id', 'status', 'professor__user__department'
+                )
+            )
+            if siblings:
+                Application.objects.filter(pk__in=[row['pk'] for row in siblings]).update(
+                    status='withdrawn', responded_at=now
+                )
+
+            deltas = Counter({'slots:filled': len(accepted), 'teams:placed': len(accepted)})
+            decided = (('accepted', accepted), ('rejected', rejected), ('waitlisted', waitlisted))
+            for status, pks in decided:
+                for pk in pks:
+                    row = rows[pk]
+                    deltas.update(stats.transition_deltas(row['status'], status, row['professor__user__department']))
+            for row in siblings:
+                deltas.update(stats.transition_deltas(row['status'], 'withdrawn', row['professor__user__department']))
+
+            members = defaultdict(list)
+            for team_id, user_id in TeamMember.objects.filter(
+                team_id__in={row['team_id'] for row in rows.values()}, status='accepted'
+            ).values_list('team_id', 'user_id'):
+                members[team_id].append(user_id)
+
+            entries = []
+            for status, pks in decided:
+                for pk in pks:
+                    row = rows[pk]
+                    event = {'application_id': pk, 'team_id': row['team_id'], 'professor_id': row['professor_id']}
+                    entries.append((f'application.{status}', [*members[row['team_id']], row['professor_id']], event))
+                    if status == 'accepted':
+                        entries.append(('application.slot_filled', [row['professor_id']], event))
+            for row in siblings:
+                event = {'application_id': row['pk'], 'team_id': row['team_id'], 'professor_id': row['professor_id']}
+                entries.append(('application.withdrawn', [row['professor_id']], event))
+            publish_batch(entries)
+            stats.record(deltas)
+    except IntegrityError:
+        raise DecisionConflict('A team in this batch has already been allocated to a professor')
+
+    results = []
+    for item in decisions:
+        result = {'application_id': item['application_id']}
+        if item['application_id'] in rows:
+            result['status'] = item['status']
+        elif item['application_id'] in unchanged:
+            result['error'] = f"This application is already {item['status']}"
+        else:
+            result['error'] = 'Not a pending or waitlisted application you can answer'
+        results.append(result)
+    return results
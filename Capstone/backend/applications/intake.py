@@ -0,0 +1,193 @@
+"""
+Batched processing of the application submission queue.
+
+Submissions are taken oldest first and screened in that global order, so
+the per-team cap on open applications and each professor's slots go to the
+earliest submissions. They are then grouped by professor; each group is
+re-checked and inserted in one short transaction that locks its teams once,
+so a rush on a popular professor costs a fixed number of statements per
+batch instead of one contended INSERT per request.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, IntegerField, Value, When
+from django.utils import timezone
+
+from allocation import stats
+from events.broker import publish_batch
+from project_allocation.batches import chunks
+from teams.models import Team, TeamMember
+from users.models import ProfessorProfile
+from .models import MAX_OPEN_APPLICATIONS, OPEN_STATUSES, Application, ApplicationSubmission
+
+# Submissions per transaction, each adding a few CASE branches to its UPDATE
+GROUP_SIZE = 200
+
+
+class Screen:
+    """Checks submissions one at a time, in the order given, against current state"""
+
+    def __init__(self, team_ids, professor_ids):
+        self.applied = set()
+        self.open_counts = Counter()
+        for chunk in chunks(team_ids):
+            for team_id, professor_id, status in Application.objects.filter(team_id__in=chunk).values_list(
+                'team_id', 'professor_id', 'status'
+            ):
+                self.applied.add((team_id, professor_id))
+                if status in OPEN_STATUSES:
+                    self.open_counts[team_id] += 1
+
+        self.professors = {}
+        self.waiting = Counter()
+        for chunk in chunks(professor_ids):
+            for row in ProfessorProfile.objects.filter(pk__in=chunk).values(
+                'pk', 'total_slots', 'filled_slots', 'waitlist_size', department=F('user__department')
+            ):
+                self.professors[row['pk']] = row
+            self.waiting.update(dict(
+                Application.objects.filter(professor_id__in=chunk, status__in=OPEN_STATUSES).values(
+                    'professor_id'
+                ).annotate(count=Count('pk')).values_list('professor_id', 'count')
+            ))
+
+    def refuse(self, row):
+        """Reason to refuse a submission, or None after counting it as created"""
+        team_id, professor_id = row['team_id'], row['professor_id']
+        professor = self.professors.get(professor_id)
+        # A full professor still takes applications for the waitlist, up to its size
+        if professor is None or (
+            professor['filled_slots'] >= professor['total_slots']
+            and self.waiting[professor_id] >= professor['waitlist_size']
+        ):
+            if professor and professor['waitlist_size']:
+                return "This professor's waitlist is full"
+            return 'This professor has no available slots'
+        if (team_id, professor_id) in self.applied:
+            return 'Your team already applied to this professor'
+        if self.open_counts[team_id] >= MAX_OPEN_APPLICATIONS:
+            return f'Your team already has {MAX_OPEN_APPLICATIONS} pending or waitlisted applications'
+
+        self.applied.add((team_id, professor_id))
+        self.open_counts[team_id] += 1
+        self.waiting[professor_id] += 1
+        return None
+
+
+def process_batch(batch_size):
+    """Process up to batch_size queued submissions in arrival order; returns counts by outcome"""
+    queued = list(
+        ApplicationSubmission.objects.filter(status='queued').order_by('received_at', 'pk').values(
+            'pk', 'team_id', 'professor_id', 'message', 'received_at'
+        )[:batch_size]
+    )
+    if not queued:
+        return Counter()
+
+    # Screen the whole batch in arrival order first, so a team's cap is not
+    # spent on a later submission that happens to be grouped first
+    screen = Screen({row['team_id'] for row in queued}, {row['professor_id'] for row in queued})
+    for row in queued:
+        row['reason'] = screen.refuse(row)
+
+    # Professors in the order of their earliest submission, each group in arrival order
+    by_professor = defaultdict(list)
+    for row in queued:
+        by_professor[row['professor_id']].append(row)
+
+    outcomes = Counter()
+    for professor_id, rows in by_professor.items():
+        for start in range(0, len(rows), GROUP_SIZE):
+            outcomes.update(_process_professor(professor_id, rows[start:start + GROUP_SIZE]))
+    return outcomes
+
+
+def _process_professor(professor_id, rows):
+    now = timezone.now()
+    with transaction.atomic():
+        team_ids = sorted({row['team_id'] for row in rows})
+        Team.objects.lock(team_ids)
+
+        # Another worker may have taken some of these rows meanwhile
+        still_queued = set(
+            ApplicationSubmission.objects.select_for_update().filter(
+                pk__in=[row['pk'] for row in rows], status='queued'
+            ).values_list('pk', flat=True)
+        )
+        rows = [row for row in rows if row['pk'] in still_queued]
+        if not rows:
+            return Counter()
+
+        # Re-check under the team locks; rows the screen refused stay refused
+        screen = Screen(team_ids, [professor_id])
+        professor = screen.professors.get(professor_id)
+        accepted, reasons = [], {}
+        for row in rows:
+            reason = row['reason'] or screen.refuse(row)
+            if reason:
+                reasons[row['pk']] = reason
+            else:
+                accepted.append(row)
+
+        applications = Application.objects.bulk_create([
+            Application(
+                team_id=row['team_id'], professor_id=professor_id, message=row['message'],
+                submitted_at=row['received_at'],
+            )
+            for row in accepted
+        ])
+        if any(application.pk is None for application in applications):
+            created = dict(
+                Application.objects.filter(
+                    professor_id=professor_id, team_id__in=[row['team_id'] for row in accepted]
+                ).values_list('team_id', 'pk')
+            )
+        else:
+            created = {application.team_id: application.pk for application in applications}
+        application_ids = {row['pk']: created[row['team_id']] for row in accepted}
+
+        submissions = ApplicationSubmission.objects.filter(pk__in=[row['pk'] for row in rows])
+        submissions.update(
+            status=Case(
+                When(pk__in=list(application_ids), then=Value('created')),
+                default=Value('rejected'),
+                output_field=CharField(),
+            ),
+            application_id=Case(
+                *[When(pk=pk, then=Value(application_id)) for pk, application_id in application_ids.items()],
+                default=None,
+                output_field=IntegerField(),
+            ),
+            reason=Case(
+                *[When(pk=pk, then=Value(reason)) for pk, reason in reasons.items()],
+                default=Value(''),
+                output_field=CharField(),
+            ),
+            processed_at=now,
+        )
+
+        members = defaultdict(list)
+        for team_id, user_id in TeamMember.objects.filter(
+            team_id__in=team_ids, status='accepted'
+        ).values_list('team_id', 'user_id'):
+            members[team_id].append(user_id)
+
+        entries = []
+        for row in rows:
+            result = {'submission_id': row['pk'], 'team_id': row['team_id'], 'professor_id': professor_id}
+            if row['pk'] in application_ids:
+                event = {'application_id': application_ids[row['pk']], 'team_id': row['team_id'], 'professor_id': professor_id}
+                entries.append(('application.submitted', [professor_id], event))
+                result.update(status='created', application_id=application_ids[row['pk']])
+            else:
+                result.update(status='rejected', reason=reasons[row['pk']])
+            entries.append(('application.submission_processed', members[row['team_id']], result))
+        publish_batch(entries)
+
+        if accepted:
+            # bulk_create skips the post_save signal that counts applications
+            stats.record(stats.transition_deltas(None, 'pending', professor['department'], count=len(accepted)))
+
+    return Counter(created=len(accepted), rejected=len(reasons))
@@ -0,0 +1,164 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from applications.models import Application
+from teams.models import Team, TeamMember
+from users.models import User, ProfessorProfile
+
+PREFIX = 'planprobe'
+
+# A table scan that is not walking an index, per database vendor
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?! USING)(?:\s|$)'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+}
+
+
+def hot_queries(sample):
+    """The lookups the API runs on every request, keyed by a readable label"""
+    return {
+        'team membership of a user': TeamMember.objects.filter(user_id=sample['student'], status='accepted'),
+        'pending invitations of a user': TeamMember.objects.pending().filter(user_id=sample['student']),
+        'expired invitations to sweep': TeamMember.objects.filter(status='pending', expires_at__lte=timezone.now()),
+        'teams with space': Team.objects.with_space(),
+        'available students': User.objects.filter(role='student', department=sample['department']).exclude(
+            Exists(TeamMember.objects.filter(user=OuterRef('pk'), status='accepted'))
+        ).order_by('username'),
+        'applications of a team': Application.objects.filter(team_id=sample['team']),
+        'pending applications of a team': Application.objects.filter(team_id=sample['team'], status='pending'),
+        'applications of a professor by status': Application.objects.filter(
+            professor_id=sample['professor'], status='accepted'
+        ),
+        'pending queue of a professor': Application.objects.filter(
+            professor_id=sample['professor'], status='pending'
+        ),
+        'waitlist head of a professor': Application.objects.waitlist(sample['professor'])[:1],
+        'latest applications': Application.objects.all()[:20],
+    }
+
+
+class Command(BaseCommand):
+    help = ('EXPLAIN the hot queries against a synthetic dataset in a throwaway test database '
+            'and fail on any full table scan')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000, help='Size of the synthetic cohort')
+        parser.add_argument('--professors', type=int, default=50)
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Reuse the test database between runs instead of creating it each time')
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'Query plan checks are not supported on {connection.vendor}')
+
+        # The dataset is seeded into a migrated test database, the same one
+        # the test runner would use, never into the configured database
+        verbosity = max(options['verbosity'] - 1, 0)
+        old_config = setup_databases(
+            verbosity, interactive=False, keepdb=options['keepdb'],
+            aliases={DEFAULT_DB_ALIAS}, serialized_aliases=set(),
+        )
+        try:
+            failures = self.check_plans(pattern, options)
+        finally:
+            teardown_databases(old_config, verbosity, keepdb=options['keepdb'])
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot queries fall back to a full table scan')
+        self.stdout.write(self.style.SUCCESS('All hot queries use an index'))
+
+    def check_plans(self, pattern, options):
+        """Seed the test database, EXPLAIN every hot query and return the labels that scan"""
+        failures = []
+        # Rolled back so a kept test database stays empty
+        with transaction.atomic():
+            sample = self.seed(options['students'], options['professors'])
+            if connection.vendor == 'postgresql':
+                # Small tables are cheaper to scan; ask whether an index could be used at all
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for label, queryset in hot_queries(sample).items():
+                plan = queryset.explain()
+                scanned = sorted(set(pattern.findall(plan)))
+                if scanned:
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(f"SCAN  {label}: {', '.join(scanned)}"))
+                else:
+                    self.stdout.write(f'ok    {label}')
+                if options['verbosity'] > 1 or scanned:
+                    self.stdout.write(plan)
+
+            transaction.set_rollback(True)
+        return failures
+
+    def seed(self, students, professors):
+        """Create a cohort of teams, invitations and applications with bulk inserts"""
+        departments = ['CS', 'EE', 'ME', 'CE']
+        now = timezone.now()
+
+        users = User.objects.bulk_create([
+            User(
+                username=f'{PREFIX}-student-{i}', email=f'{PREFIX}-student-{i}@example.com',
+                password='!', role='student', department=departments[i % len(departments)]
+            )
+            for i in range(students)
+        ] + [
+            User(
+                username=f'{PREFIX}-teacher-{i}', email=f'{PREFIX}-teacher-{i}@example.com',
+                password='!', role='teacher', department=departments[i % len(departments)]
+            )
+            for i in range(professors)
+        ], batch_size=500)
+        if any(user.pk is None for user in users):
+            users = list(User.objects.filter(username__startswith=f'{PREFIX}-').order_by('pk'))
+        student_ids = [user.pk for user in users if user.role == 'student']
+        teacher_ids = [user.pk for user in users if user.role == 'teacher']
+
+        ProfessorProfile.objects.bulk_create(
+            [ProfessorProfile(user_id=pk, total_slots=5) for pk in teacher_ids], batch_size=500
+        )
+
+        # Three accepted members per team, the fourth student is invited
+        groups = [student_ids[i:i + 4] for i in range(0, len(student_ids) - 3, 4)]
+        Team.objects.bulk_create([
+            Team(name=f'{PREFIX}-team-{i}', leader_id=group[0], accepted_member_count=3)
+            for i, group in enumerate(groups)
+        ], batch_size=500)
+        team_ids = dict(Team.objects.filter(name__startswith=f'{PREFIX}-').values_list('leader_id', 'pk'))
+
+        members = []
+        for group in groups:
+            team_id = team_ids[group[0]]
+            members.extend(
+                TeamMember(team_id=team_id, user_id=user_id, status='accepted', responded_at=now)
+                for user_id in group[:3]
+            )
+            members.append(TeamMember(
+                team_id=team_id, user_id=group[3], status='pending', expires_at=now - timedelta(hours=1)
+            ))
+        TeamMember.objects.bulk_create(members, batch_size=500)
+
+        statuses = ['pending', 'pending', 'rejected', 'withdrawn', 'accepted', 'waitlisted']
+        Application.objects.bulk_create([
+            Application(
+                team_id=team_id, professor_id=teacher_ids[(index + offset) % len(teacher_ids)],
+                status=statuses[(index + offset) % len(statuses)]
+            )
+            for index, team_id in enumerate(team_ids.values())
+            for offset in range(min(3, len(teacher_ids)))
+        ], batch_size=500)
+
+        return {
+            'student': groups[0][3],
+            'team': team_ids[groups[0][0]],
+            'professor': teacher_ids[0],
+            'department': departments[0],
+        }
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.intake import process_batch
+
+
+class Command(BaseCommand):
+    help = 'Turn queued application submissions into applications in arrival order'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.APPLICATION_INTAKE_BATCH,
+                            help='Submissions taken from the queue per round')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue until interrupted')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to wait between polls of an empty queue with --loop')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        created = rejected = 0
+        try:
+            while True:
+                outcomes = process_batch(options['batch_size'])
+                created += outcomes['created']
+                rejected += outcomes['rejected']
+                if outcomes:
+                    self.stdout.write(f"Created {outcomes['created']}, rejected {outcomes['rejected']}")
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Processed queue: {created} created, {rejected} rejected'))
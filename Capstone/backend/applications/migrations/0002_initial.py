@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('teams', '0001_initial'),
+        ('applications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='professor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='users.professorprofile'),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='team',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='teams.team'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='application',
+            unique_together={('team', 'professor')},
+        ),
+    ]
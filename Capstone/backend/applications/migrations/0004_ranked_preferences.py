@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='professor_rank',
+            field=models.PositiveIntegerField(blank=True, help_text="The professor's preference for this team, 1 being the first choice", null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='team_rank',
+            field=models.PositiveSmallIntegerField(blank=True, help_text="The team's preference for this professor, 1 being its first choice", null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='application',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'accepted')), fields=('team',), name='one_accepted_application_per_team'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0006_hot_lookup_indexes'),
+        ('users', '0004_user_role_dept_username_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('applications', '0005_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('created', 'Created'), ('rejected', 'Rejected')], default='queued', max_length=10)),
+                ('reason', models.CharField(blank=True, help_text='Why the submission was rejected', max_length=200)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('application', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='applications.application')),
+                ('professor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='users.professorprofile')),
+                ('submitted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='application_submissions', to=settings.AUTH_USER_MODEL)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='teams.team')),
+            ],
+            options={
+                'verbose_name': 'Application Submission',
+                'verbose_name_plural': 'Application Submissions',
+                'ordering': ['received_at', 'pk'],
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['received_at', 'id'], name='submission_queue_idx'), models.Index(fields=['team', 'received_at'], name='submission_team_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:39
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.utils.timezone
+
+
+def stamp_received_at(apps, schema_editor):
+    # Applications created from the queue were stamped when processed
+    Application = apps.get_model('applications', 'Application')
+    ApplicationSubmission = apps.get_model('applications', 'ApplicationSubmission')
+    received = ApplicationSubmission.objects.filter(application_id=OuterRef('pk')).values('received_at')[:1]
+    Application.objects.filter(
+        pk__in=ApplicationSubmission.objects.filter(application__isnull=False).values('application_id')
+    ).update(submitted_at=Subquery(received))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_submission_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='submitted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(stamp_received_at, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,45 @@
-from django.db import models
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from allocation import stats
+from events.broker import publish, team_recipients
 from users.models import ProfessorProfile
 from teams.models import Team
 
 
+class DecisionConflict(Exception):
+    """Raised when a decision loses a race or the professor has no slot left"""
+
+
+# Statuses of applications a team still has open with professors
+OPEN_STATUSES = ('pending', 'waitlisted')
+MAX_OPEN_APPLICATIONS = 4
+
+
+class ApplicationQuerySet(models.QuerySet):
+    """Conditional status transitions for applications"""
+    
+    def transition(self, pk, status, current='pending', **fields):
+        """Move one application from current to status with a conditional UPDATE; False if it had already moved"""
+        fields.setdefault('responded_at', timezone.now())
+        return self.filter(pk=pk, status=current).update(status=status, **fields) == 1
+    
+    def withdraw_siblings(self, team_id, exclude_pk):
+        """Withdraw a team's other open applications once one is accepted"""
+        return self.filter(team_id=team_id, status__in=OPEN_STATUSES).exclude(pk=exclude_pk).update(
+            status='withdrawn', responded_at=timezone.now()
+        )
+    
+    def waitlist(self, professor_id):
+        """A professor's waitlist, ranked applications first, then in the order they were waitlisted"""
+        return self.filter(professor_id=professor_id, status='waitlisted').order_by(
+            F('professor_rank').asc(nulls_last=True), 'responded_at', 'pk'
+        )
+
+
 class Application(models.Model):
     """Model for project applications from teams to professors"""
     
@@ -11,42 +48,211 @@ class Application(models.Model):
         ('accepted', 'Accepted'),
         ('rejected', 'Rejected'),
         ('withdrawn', 'Withdrawn'),
+        ('waitlisted', 'Waitlisted'),
     ]
     
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='applications')
     professor = models.ForeignKey(ProfessorProfile, on_delete=models.CASCADE, related_name='applications')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
-    submitted_at = models.DateTimeField(auto_now_add=True)
+    # Queued submissions are stamped with the time they were received, not processed
+    submitted_at = models.DateTimeField(default=timezone.now, editable=False)
     responded_at = models.DateTimeField(null=True, blank=True)
     message = models.TextField(blank=True, null=True, help_text="Optional message from team to professor")
     professor_response = models.TextField(blank=True, null=True, help_text="Professor's response message")
+    team_rank = models.PositiveSmallIntegerField(
+        null=True, blank=True,
+        help_text="The team's preference for this professor, 1 being its first choice"
+    )
+    professor_rank = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text="The professor's preference for this team, 1 being the first choice"
+    )
+    
+    objects = ApplicationQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'Application'
         verbose_name_plural = 'Applications'
         unique_together = ['team', 'professor']
         ordering = ['-submitted_at']
+        constraints = [
+            # A team is allocated to at most one professor
+            models.UniqueConstraint(
+                fields=['team'],
+                condition=Q(status='accepted'),
+                name='one_accepted_application_per_team'
+            ),
+        ]
+        indexes = [
+            # Pending-application cap and a team's application list
+            models.Index(fields=['team', 'status'], name='application_team_status_idx'),
+            # A professor's applications filtered by status
+            models.Index(fields=['professor', 'status'], name='application_prof_status_idx'),
+            # Default ordering of every application listing
+            models.Index(fields=['-submitted_at'], name='application_submitted_idx'),
+            # A professor's pending queue, oldest first, without dead rows
+            models.Index(
+                fields=['professor', 'submitted_at'],
+                condition=Q(status='pending'),
+                name='application_prof_pending_idx'
+            ),
+            # Head of a professor's waitlist when a slot frees up
+            models.Index(
+                fields=['professor', 'professor_rank', 'responded_at'],
+                condition=Q(status='waitlisted'),
+                name='application_prof_waitlist_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.team.name} -> Prof. {self.professor.user.get_full_name()} ({self.status})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
+    def _status_change(self):
+        """(previous, status) if saving this instance changes its status, else None"""
+        if self._state.adding:
+            # Creating a row is a change from no status; plain pending rows need no settling
+            return None if self.status == 'pending' else (None, self.status)
+        previous = getattr(self, '_loaded_status', None)
+        if previous is None or previous == self.status:
+            return None
+        return previous, self.status
+    
+    def clean(self):
+        # Catch the usual reasons an accept fails before save() raises DecisionConflict
+        if self.status != 'accepted' or self._status_change() is None:
+            return
+        if not ProfessorProfile.objects.filter(pk=self.professor_id, filled_slots__lt=F('total_slots')).exists():
+            raise ValidationError({'status': 'No available slots to accept this application'})
+        if Application.objects.filter(team_id=self.team_id, status='accepted').exclude(pk=self.pk).exists():
+            raise ValidationError({'status': 'This team has already been allocated to a professor'})
+    
     def save(self, *args, **kwargs):
-        # Update responded_at when status changes from pending
-        if self.pk:
-            old_instance = Application.objects.get(pk=self.pk)
-            if old_instance.status == 'pending' and self.status != 'pending':
-                from django.utils import timezone
-                self.responded_at = timezone.now()
+        # Status changes saved directly, e.g. from the admin, are settled the
+        # same way as decide() using the status loaded with the row
+        change = self._status_change()
+        if change is None:
+            super().save(*args, **kwargs)
+            self._loaded_status = self.status
+            return
+        
+        self.responded_at = timezone.now()
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                self._settle(*change)
+        except IntegrityError:
+            raise DecisionConflict('This team has already been allocated to a professor')
+        self._loaded_status = self.status
+    
+    def decide(self, status, **fields):
+        """
+        Move this application to status in one transaction.
         
-        super().save(*args, **kwargs)
+        The transition and the professor's slot are both taken with conditional
+        UPDATEs, so concurrent decisions can neither overwrite each other nor
+        overfill the professor. Raises DecisionConflict if either guard fails.
+        """
+        previous = self.status
+        fields.setdefault('responded_at', timezone.now())
+        try:
+            with transaction.atomic():
+                if status == 'accepted':
+                    # Accepts for one team take turns so sibling withdrawals cannot deadlock
+                    Team.objects.lock([self.team_id])
+                if not Application.objects.transition(self.pk, status, current=previous, **fields):
+                    raise DecisionConflict('This application has already been answered')
+                self._settle(previous, status)
+        except IntegrityError:
+            raise DecisionConflict('This team has already been allocated to a professor')
         
-        # If application is accepted, withdraw other pending applications from this team
-        if self.status == 'accepted':
-            Application.objects.filter(
-                team=self.team,
-                status='pending'
-            ).exclude(pk=self.pk).update(status='withdrawn')
-            
-            # Increment professor's filled slots
-            self.professor.filled_slots += 1
-            self.professor.save() 
\ No newline at end of file
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.status = self._loaded_status = status
+    
+    def _settle(self, previous, status):
+        """Slot changes, sibling withdrawals, promotions and events for a status change, inside its transaction"""
+        from .waitlist import promote
+        
+        event = {'application_id': self.pk, 'team_id': self.team_id, 'professor_id': self.professor_id}
+        # A new row's own status is already counted by the post_save signal
+        deltas = Counter()
+        if previous is not None:
+            deltas = stats.transition_deltas(previous, status, stats.professor_department(self.professor_id))
+        if status == 'accepted':
+            if not ProfessorProfile.objects.reserve_slot(self.professor_id):
+                raise DecisionConflict('No available slots to accept this application')
+            siblings = Application.objects.filter(team_id=self.team_id, status__in=OPEN_STATUSES).exclude(pk=self.pk)
+            for pk, professor_id, sibling_status, department in siblings.values_list(
+                'pk', 'professor_id', 'status', 'professor__user__department'
+            ):
+                publish(
+                    'application.withdrawn', [professor_id],
+                    application_id=pk, team_id=self.team_id, professor_id=professor_id
+                )
+                deltas.update(stats.transition_deltas(sibling_status, 'withdrawn', department))
+            Application.objects.withdraw_siblings(self.team_id, exclude_pk=self.pk)
+            publish('application.slot_filled', [self.professor_id], **event)
+            deltas.update({'slots:filled': 1, 'teams:placed': 1})
+        elif previous == 'accepted':
+            deltas['teams:placed'] -= 1
+            if ProfessorProfile.objects.release_slot(self.professor_id):
+                deltas['slots:filled'] -= 1
+        publish(f'application.{status}', [*team_recipients(self.team_id), self.professor_id], **event)
+        if previous == 'accepted':
+            # The freed slot goes to the head of the professor's waitlist
+            deltas.update(promote(self.professor_id))
+        stats.record(deltas)
+
+
+class ApplicationSubmission(models.Model):
+    """
+    A queued request to submit an application.
+    
+    With the intake queue enabled, submissions are recorded with a server
+    timestamp and answered with 202; process_submissions turns them into
+    applications in arrival order, one batch per professor.
+    """
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('created', 'Created'),
+        ('rejected', 'Rejected'),
+    ]
+    
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='submissions')
+    professor = models.ForeignKey(ProfessorProfile, on_delete=models.CASCADE, related_name='submissions')
+    submitted_by = models.ForeignKey(
+        'users.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='application_submissions'
+    )
+    message = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    reason = models.CharField(max_length=200, blank=True, help_text="Why the submission was rejected")
+    application = models.ForeignKey(
+        Application, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Application Submission'
+        verbose_name_plural = 'Application Submissions'
+        ordering = ['received_at', 'pk']
+        indexes = [
+            # The queue, oldest first, without processed rows
+            models.Index(
+                fields=['received_at', 'id'],
+                condition=Q(status='queued'),
+                name='submission_queue_idx'
+            ),
+            # A team polling for its outcomes
+            models.Index(fields=['team', 'received_at'], name='submission_team_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.team.name} -> Prof. {self.professor.user.get_full_name()} ({self.status})"
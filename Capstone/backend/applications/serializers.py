@@ -1,6 +1,9 @@
 from rest_framework import serializers
-from .models import Application
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Concat, Trim
+from .models import MAX_OPEN_APPLICATIONS, OPEN_STATUSES, Application, ApplicationSubmission
 from teams.serializers import TeamSerializer
+from users.claims import get_team_id
 from users.serializers import ProfessorProfileSerializer
 
 
@@ -12,7 +15,64 @@ class ApplicationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Application
-        fields = ('id', 'team', 'professor', 'status', 'submitted_at', 'responded_at', 'message', 'professor_response')
+        fields = (
+            'id', 'team', 'professor', 'status', 'submitted_at', 'responded_at',
+            'message', 'professor_response', 'team_rank'
+        )
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        queryset = TeamSerializer.setup_eager_loading(queryset, prefix='team__')
+        return ProfessorProfileSerializer.setup_eager_loading(queryset, prefix='professor__')
+
+
+class ApplicationSummarySerializer(serializers.ModelSerializer):
+    """Flat serializer for application listings, read from one joined and annotated query"""
+    
+    team_id = serializers.IntegerField(read_only=True)
+    team_name = serializers.CharField(read_only=True)
+    team_size = serializers.IntegerField(read_only=True)
+    professor_id = serializers.IntegerField(read_only=True)
+    professor_name = serializers.CharField(read_only=True)
+    professor_department = serializers.CharField(read_only=True)
+    total_slots = serializers.IntegerField(read_only=True)
+    filled_slots = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Application
+        fields = (
+            'id', 'status', 'submitted_at', 'responded_at',
+            'team_id', 'team_name', 'team_size',
+            'professor_id', 'professor_name', 'professor_department', 'total_slots', 'filled_slots',
+            'team_rank', 'professor_rank',
+        )
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.annotate(
+            team_name=F('team__name'),
+            team_size=F('team__accepted_member_count'),
+            professor_name=Trim(Concat(
+                'professor__user__first_name', Value(' '), 'professor__user__last_name'
+            )),
+            professor_department=F('professor__user__department'),
+            total_slots=F('professor__total_slots'),
+            filled_slots=F('professor__filled_slots'),
+        ).only(
+            'id', 'status', 'submitted_at', 'responded_at', 'team_id', 'professor_id',
+            'team_rank', 'professor_rank'
+        )
+
+
+class ApplicationBriefSerializer(serializers.ModelSerializer):
+    """Serializer for applications that reference the professor by id"""
+    
+    class Meta:
+        model = Application
+        fields = (
+            'id', 'professor', 'status', 'submitted_at', 'responded_at',
+            'message', 'professor_response', 'team_rank'
+        )
 
 
 class ApplicationCreateSerializer(serializers.ModelSerializer):
@@ -30,26 +90,59 @@ class ApplicationCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Only students can submit applications")
         
         # Get user's team
-        try:
-            team = user.team_memberships.get(status='accepted').team
-        except:
+        team_id = get_team_id(user)
+        if team_id is None:
             raise serializers.ValidationError("You must be in a team to submit applications")
         
-        # Check if team already has 4 pending applications
-        pending_count = Application.objects.filter(team=team, status='pending').count()
-        if pending_count >= 4:
-            raise serializers.ValidationError("Your team already has 4 pending applications")
+        # Check if team already has the maximum of open applications
+        open_count = Application.objects.filter(team_id=team_id, status__in=OPEN_STATUSES).count()
+        if open_count >= MAX_OPEN_APPLICATIONS:
+            raise serializers.ValidationError(
+                f"Your team already has {MAX_OPEN_APPLICATIONS} pending or waitlisted applications"
+            )
         
-        # Check if professor has available slots
+        # A full professor still takes applications for the waitlist, up to its size
         professor = attrs['professor']
         if not professor.can_accept_application():
-            raise serializers.ValidationError("This professor has no available slots")
+            waiting = Application.objects.filter(professor=professor, status__in=OPEN_STATUSES).count()
+            if waiting >= professor.waitlist_size:
+                raise serializers.ValidationError(
+                    "This professor's waitlist is full" if professor.waitlist_size
+                    else "This professor has no available slots"
+                )
         
         # Check if team already applied to this professor
-        if Application.objects.filter(team=team, professor=professor).exists():
+        if Application.objects.filter(team_id=team_id, professor=professor).exists():
             raise serializers.ValidationError("Your team already applied to this professor")
         
-        attrs['team'] = team
+        attrs['team_id'] = team_id
+        return attrs
+
+
+class ApplicationSubmissionSerializer(serializers.ModelSerializer):
+    """Serializer for queued application submissions"""
+    
+    class Meta:
+        model = ApplicationSubmission
+        fields = (
+            'id', 'team', 'professor', 'message', 'status', 'reason', 'application',
+            'received_at', 'processed_at'
+        )
+        read_only_fields = ('team', 'status', 'reason', 'application', 'received_at', 'processed_at')
+    
+    def validate(self, attrs):
+        # Only the cheap checks run at intake; slots, duplicates and the
+        # open-application cap are checked when the queue is processed
+        user = self.context['request'].user
+        if user.role != 'student':
+            raise serializers.ValidationError("Only students can submit applications")
+        
+        team_id = get_team_id(user)
+        if team_id is None:
+            raise serializers.ValidationError("You must be in a team to submit applications")
+        
+        attrs['team_id'] = team_id
+        attrs['submitted_by'] = user
         return attrs
 
 
@@ -61,15 +154,55 @@ class ApplicationResponseSerializer(serializers.ModelSerializer):
         fields = ('status', 'professor_response')
     
     def validate_status(self, value):
-        if value not in ['accepted', 'rejected']:
-            raise serializers.ValidationError("Status must be 'accepted' or 'rejected'")
+        if value not in ['accepted', 'rejected', 'waitlisted']:
+            raise serializers.ValidationError("Status must be 'accepted', 'rejected' or 'waitlisted'")
+        if self.instance is not None and value == self.instance.status:
+            raise serializers.ValidationError(f"This application is already {value}")
         return value
+
+
+class ApplicationRankSerializer(serializers.Serializer):
+    """Serializer for ranking pending applications, first choice first"""
     
-    def validate(self, attrs):
-        # Check if professor has available slots when accepting
-        if attrs['status'] == 'accepted':
-            professor = self.instance.professor
-            if not professor.can_accept_application():
-                raise serializers.ValidationError("No available slots to accept this application")
+    application_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=True,
+        max_length=1000
+    )
+    
+    def validate_application_ids(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Each application can only be ranked once")
         
-        return attrs 
\ No newline at end of file
+        rankable = set(self.context['queryset'].filter(pk__in=value).values_list('pk', flat=True))
+        unknown = [pk for pk in value if pk not in rankable]
+        if unknown:
+            raise serializers.ValidationError(f"Not a pending application you can rank: {unknown}")
+        return value
+    
+    def save(self):
+        """Write every rank with one UPDATE; applications left out of the list lose their rank"""
+        ranks = [When(pk=pk, then=Value(rank)) for rank, pk in enumerate(self.validated_data['application_ids'], 1)]
+        return self.context['queryset'].update(**{
+            self.context['field']: Case(*ranks, default=None, output_field=IntegerField())
+        })
+
+
+class ApplicationDecisionSerializer(serializers.Serializer):
+    """One item of a bulk response"""
+    
+    application_id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=['accepted', 'rejected', 'waitlisted'])
+    professor_response = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class ApplicationBulkResponseSerializer(serializers.Serializer):
+    """Serializer for answering many pending applications at once"""
+    
+    decisions = ApplicationDecisionSerializer(many=True, allow_empty=False, max_length=200)
+    
+    def validate_decisions(self, value):
+        application_ids = [item['application_id'] for item in value]
+        if len(set(application_ids)) != len(application_ids):
+            raise serializers.ValidationError("Each application can only be answered once")
+        return value
@@ -0,0 +1,36 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from allocation import stats
+from teams.models import Team
+from users.models import ProfessorProfile
+from .models import Application
+from .waitlist import promote
+
+
+@receiver(pre_delete, sender=Team)
+def release_deleted_team_slot(sender, instance, **kwargs):
+    """A deleted team gives its professor's slot to the head of the waitlist"""
+    professor_id = Application.objects.filter(team_id=instance.pk, status='accepted').values_list(
+        'professor_id', flat=True
+    ).first()
+    if professor_id is None or not ProfessorProfile.objects.release_slot(professor_id):
+        return
+    
+    # The application's own counters are recorded when the cascade deletes it
+    deltas = Counter({'slots:filled': -1})
+    deltas.update(promote(professor_id))
+    stats.record(deltas)
+
+
+@receiver(post_save, sender=ProfessorProfile)
+def promote_into_new_slots(sender, instance, created, **kwargs):
+    """Raising a professor's slots promotes from the waitlist straight away"""
+    if created or instance.total_slots <= instance.filled_slots:
+        return
+    
+    with transaction.atomic():
+        stats.record(promote(instance.pk))
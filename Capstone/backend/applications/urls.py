@@ -6,7 +6,12 @@ app_name = 'applications'
 urlpatterns = [
     path('applications/', views.ApplicationListView.as_view(), name='application-list'),
     path('applications/create/', views.ApplicationCreateView.as_view(), name='application-create'),
+    path('applications/submissions/', views.ApplicationSubmissionListView.as_view(), name='submission-list'),
+    path('applications/submissions/<int:pk>/', views.ApplicationSubmissionDetailView.as_view(), name='submission-detail'),
     path('applications/<int:pk>/', views.ApplicationDetailView.as_view(), name='application-detail'),
     path('applications/<int:pk>/response/', views.ApplicationResponseView.as_view(), name='application-response'),
+    path('applications/responses/', views.ApplicationBulkResponseView.as_view(), name='application-bulk-response'),
+    path('applications/rank/', views.ApplicationRankView.as_view(), name='application-rank'),
     path('applications/<int:pk>/withdraw/', views.withdraw_application, name='application-withdraw'),
+    path('bootstrap/', views.bootstrap, name='bootstrap'),
 ] 
\ No newline at end of file
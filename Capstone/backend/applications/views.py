@@ -1,27 +1,97 @@
+from django.conf import settings
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
-from .models import Application
+from allocation.rounds import PhaseMixin
+from events.broker import publish
+from project_allocation.exceptions import Conflict
+from project_allocation.mixins import EagerLoadingMixin
+from users.claims import get_team_id, get_professor_id
+from users.serializers import UserSerializer, ProfessorProfileSerializer
+from teams.models import Team, TeamMember
+from teams.serializers import TeamSerializer, TeamMemberSerializer
+from .models import OPEN_STATUSES, Application, ApplicationSubmission, DecisionConflict
 from .serializers import (
     ApplicationSerializer, 
+    ApplicationSummarySerializer,
+    ApplicationBriefSerializer,
     ApplicationCreateSerializer, 
-    ApplicationResponseSerializer
+    ApplicationSubmissionSerializer,
+    ApplicationResponseSerializer,
+    ApplicationRankSerializer,
+    ApplicationBulkResponseSerializer
 )
+from .decisions import decide_bulk
 
 
-class ApplicationCreateView(generics.CreateAPIView):
+class ApplicationCreateView(PhaseMixin, generics.CreateAPIView):
     """API view for creating applications"""
     serializer_class = ApplicationCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    phase = 'applications'
     
-    def perform_create(self, serializer):
+    def get_serializer_class(self):
+        if settings.APPLICATION_INTAKE_QUEUE:
+            return ApplicationSubmissionSerializer
+        return ApplicationCreateSerializer
+    
+    def create(self, request, *args, **kwargs):
+        if not settings.APPLICATION_INTAKE_QUEUE:
+            return super().create(request, *args, **kwargs)
+        
+        # Record the request and answer at once; process_submissions creates
+        # the application in arrival order and reports the outcome
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         serializer.save()
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+    
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            application = serializer.save()
+            publish(
+                'application.submitted', [application.professor_id],
+                application_id=application.pk, team_id=application.team_id,
+                professor_id=application.professor_id
+            )
+
+
+class SubmissionQuerysetMixin:
+    """Queued submissions the caller may see: their team's, or every one for admins"""
+    
+    def get_queryset(self):
+        user = self.request.user
+        
+        if user.role == 'student':
+            team_id = get_team_id(user)
+            if team_id is None:
+                return ApplicationSubmission.objects.none()
+            return ApplicationSubmission.objects.filter(team_id=team_id).order_by('-received_at', '-pk')
+        
+        elif user.role == 'admin':
+            return ApplicationSubmission.objects.order_by('-received_at', '-pk')
+        
+        else:
+            return ApplicationSubmission.objects.none()
 
 
-class ApplicationListView(generics.ListAPIView):
+class ApplicationSubmissionListView(SubmissionQuerysetMixin, generics.ListAPIView):
+    """API view for polling the outcome of queued submissions"""
+    serializer_class = ApplicationSubmissionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class ApplicationSubmissionDetailView(SubmissionQuerysetMixin, generics.RetrieveAPIView):
+    """API view for the outcome of one queued submission"""
+    serializer_class = ApplicationSubmissionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class ApplicationListView(EagerLoadingMixin, generics.ListAPIView):
     """API view for listing applications"""
     serializer_class = ApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -30,31 +100,36 @@ class ApplicationListView(generics.ListAPIView):
     search_fields = ['team__name', 'professor__user__first_name', 'professor__user__last_name']
     ordering_fields = ['submitted_at', 'responded_at']
     
+    def get_serializer_class(self):
+        # Teachers and admins page through many applications, so they get the
+        # flat summary; the nested form is left to the detail view
+        if self.request.user.role in ('teacher', 'admin'):
+            return ApplicationSummarySerializer
+        return ApplicationSerializer
+    
     def get_queryset(self):
         user = self.request.user
         
         if user.role == 'student':
             # Students can see their team's applications
-            try:
-                team = user.team_memberships.get(status='accepted').team
-                return Application.objects.filter(team=team)
-            except:
+            team_id = get_team_id(user)
+            if team_id is None:
                 return Application.objects.none()
+            return Application.objects.filter(team_id=team_id)
         
         elif user.role == 'teacher':
             # Teachers can see applications to them
-            try:
-                professor_profile = user.professorprofile
-                return Application.objects.filter(professor=professor_profile)
-            except:
+            professor_id = get_professor_id(user)
+            if professor_id is None:
                 return Application.objects.none()
+            return Application.objects.filter(professor_id=professor_id)
         
         else:
             # Admins can see all applications
             return Application.objects.all()
 
 
-class ApplicationDetailView(generics.RetrieveAPIView):
+class ApplicationDetailView(EagerLoadingMixin, generics.RetrieveAPIView):
     """API view for application details"""
     serializer_class = ApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -64,53 +139,142 @@ class ApplicationDetailView(generics.RetrieveAPIView):
         
         if user.role == 'student':
             # Students can see their team's applications
-            try:
-                team = user.team_memberships.get(status='accepted').team
-                return Application.objects.filter(team=team)
-            except:
+            team_id = get_team_id(user)
+            if team_id is None:
                 return Application.objects.none()
+            return Application.objects.filter(team_id=team_id)
         
         elif user.role == 'teacher':
             # Teachers can see applications to them
-            try:
-                professor_profile = user.professorprofile
-                return Application.objects.filter(professor=professor_profile)
-            except:
+            professor_id = get_professor_id(user)
+            if professor_id is None:
                 return Application.objects.none()
+            return Application.objects.filter(professor_id=professor_id)
         
         else:
             # Admins can see all applications
             return Application.objects.all()
 
 
-class ApplicationResponseView(generics.UpdateAPIView):
+class ApplicationResponseView(PhaseMixin, generics.UpdateAPIView):
     """API view for professor responses to applications"""
     serializer_class = ApplicationResponseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    phase = 'decisions'
     
     def get_queryset(self):
         user = self.request.user
         
         if user.role == 'teacher':
-            # Teachers can respond to applications to them
-            try:
-                professor_profile = user.professorprofile
-                return Application.objects.filter(professor=professor_profile, status='pending')
-            except:
+            # Teachers can respond to applications to them, waitlisted ones included
+            professor_id = get_professor_id(user)
+            if professor_id is None:
                 return Application.objects.none()
+            return Application.objects.filter(professor_id=professor_id, status__in=OPEN_STATUSES)
         
         elif user.role == 'admin':
             # Admins can respond to any application
-            return Application.objects.filter(status='pending')
+            return Application.objects.filter(status__in=OPEN_STATUSES)
+        
+        else:
+            return Application.objects.none()
+    
+    def perform_update(self, serializer):
+        decision = dict(serializer.validated_data)
+        if 'status' not in decision:
+            # A partial update that only edits the response message
+            serializer.save()
+            return
+        
+        # Conditional UPDATEs instead of a read-modify-write save
+        try:
+            serializer.instance.decide(decision.pop('status'), **decision)
+        except DecisionConflict as exc:
+            raise Conflict(str(exc))
+
+
+class ApplicationBulkResponseView(PhaseMixin, generics.GenericAPIView):
+    """API view for accepting, rejecting and waitlisting many open applications in one request"""
+    serializer_class = ApplicationBulkResponseSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    phase = 'decisions'
+    
+    def get_queryset(self):
+        user = self.request.user
+        
+        if user.role == 'teacher':
+            professor_id = get_professor_id(user)
+            if professor_id is None:
+                return Application.objects.none()
+            return Application.objects.filter(professor_id=professor_id)
+        
+        elif user.role == 'admin':
+            return Application.objects.all()
         
         else:
             return Application.objects.none()
+    
+    def post(self, request):
+        if request.user.role not in ('teacher', 'admin'):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            results = decide_bulk(self.get_queryset(), serializer.validated_data['decisions'])
+        except DecisionConflict as exc:
+            raise Conflict(str(exc))
+        
+        return Response({
+            'results': results,
+            'accepted': sum(1 for result in results if result.get('status') == 'accepted'),
+            'rejected': sum(1 for result in results if result.get('status') == 'rejected'),
+            'waitlisted': sum(1 for result in results if result.get('status') == 'waitlisted'),
+            'failed': sum(1 for result in results if 'error' in result),
+        })
+
+
+class ApplicationRankView(generics.GenericAPIView):
+    """API view for ranking pending applications for the allocation engine"""
+    serializer_class = ApplicationRankSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        user = request.user
+        
+        if user.role == 'student':
+            # Teams rank the professors they applied to
+            team_id = get_team_id(user)
+            if team_id is None:
+                return Response({'error': 'You must be in a team'}, status=status.HTTP_403_FORBIDDEN)
+            queryset, field = Application.objects.filter(team_id=team_id, status='pending'), 'team_rank'
+        
+        elif user.role == 'teacher':
+            # Professors rank the teams that applied to them; the same ranks order their waitlist
+            professor_id = get_professor_id(user)
+            if professor_id is None:
+                return Response({'error': 'Professor profile not found'}, status=status.HTTP_404_NOT_FOUND)
+            queryset = Application.objects.filter(professor_id=professor_id, status__in=OPEN_STATUSES)
+            field = 'professor_rank'
+        
+        else:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        serializer = self.get_serializer(
+            data=request.data,
+            context={'request': request, 'queryset': queryset, 'field': field}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        
+        return Response({'ranked': len(serializer.validated_data['application_ids'])})
 
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def withdraw_application(request, pk):
-    """Withdraw a pending application"""
+    """Withdraw a pending, waitlisted or accepted application; an accepted one frees its slot"""
     try:
         application = Application.objects.get(pk=pk)
         
@@ -118,24 +282,65 @@ def withdraw_application(request, pk):
         user = request.user
         if user.role == 'student':
             # Students can withdraw their team's applications
-            try:
-                team = user.team_memberships.get(status='accepted').team
-                if application.team != team:
-                    return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-            except:
+            team_id = get_team_id(user)
+            if team_id is None:
                 return Response({'error': 'You must be in a team'}, status=status.HTTP_403_FORBIDDEN)
+            if application.team_id != team_id:
+                return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        elif user.role not in ['teacher', 'admin']:
+        elif user.role == 'teacher':
+            # Teachers can only withdraw applications made to them
+            if application.professor_id != get_professor_id(user):
+                return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        elif user.role != 'admin':
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
         # Check if application can be withdrawn
-        if application.status != 'pending':
-            return Response({'error': 'Can only withdraw pending applications'}, status=status.HTTP_400_BAD_REQUEST)
+        if application.status not in (*OPEN_STATUSES, 'accepted'):
+            return Response(
+                {'error': 'Can only withdraw pending, waitlisted or accepted applications'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        application.status = 'withdrawn'
-        application.save()
+        try:
+            application.decide('withdrawn')
+        except DecisionConflict as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
         
         return Response({'message': 'Application withdrawn successfully'})
         
     except Application.DoesNotExist:
-        return Response({'error': 'Application not found'}, status=status.HTTP_404_NOT_FOUND) 
\ No newline at end of file
+        return Response({'error': 'Application not found'}, status=status.HTTP_404_NOT_FOUND) 
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def bootstrap(request):
+    """Get everything the dashboard needs in one request with a fixed number of queries"""
+    user = request.user
+    team_id = get_team_id(user)
+    
+    team = None
+    applications = []
+    if team_id is not None:
+        team = TeamSerializer.setup_eager_loading(Team.objects.filter(pk=team_id)).first()
+        applications = list(ProfessorProfileSerializer.setup_eager_loading(
+            Application.objects.filter(team_id=team_id),
+            prefix='professor__'
+        ))
+    
+    invitations = TeamMemberSerializer.setup_eager_loading(
+        TeamMember.objects.pending().filter(user=user)
+    )
+    
+    professors = {application.professor_id: application.professor for application in applications}
+    context = {'request': request}
+    
+    return Response({
+        'user': UserSerializer(user).data,
+        'team': TeamSerializer(team, context=context).data if team else None,
+        'invitations': TeamMemberSerializer(invitations, many=True).data,
+        'applications': ApplicationBriefSerializer(applications, many=True).data,
+        'professors': ProfessorProfileSerializer(professors.values(), many=True).data,
+    })
\ No newline at end of file
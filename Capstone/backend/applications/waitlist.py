@@ -0,0 +1,94 @@
+"""
+Promotion of waitlisted applications when a professor's slots free up.
+
+The head of the waitlist is read through a partial index, so promotion takes
+the same handful of queries however long the waitlist is. Callers run it
+inside the transaction that freed the slot and record the returned counter
+deltas together with their own.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import F
+from django.utils import timezone
+
+from allocation import stats
+from events.broker import publish_batch
+from teams.models import Team, TeamMember
+from users.models import ProfessorProfile
+from .models import OPEN_STATUSES, Application
+
+
+def free_slots(professor_id, lock=False):
+    queryset = ProfessorProfile.objects.filter(pk=professor_id)
+    if lock:
+        queryset = queryset.select_for_update()
+    return queryset.values_list(F('total_slots') - F('filled_slots'), flat=True).first() or 0
+
+
+def promote(professor_id):
+    """
+    Accept waitlisted applications for every free slot of a professor.
+
+    Promoted teams have their other open applications withdrawn. Teams that
+    are locked by a concurrent decision are passed over rather than waited
+    on, since they are being placed elsewhere; they stay on the waitlist.
+    Returns the statistics deltas of the promotion.
+    """
+    deltas = Counter()
+    free = free_slots(professor_id)
+    if free <= 0:
+        return deltas
+
+    heads = list(Application.objects.waitlist(professor_id).values_list('pk', 'team_id')[:free])
+    if not heads:
+        return deltas
+
+    team_ids = Team.objects.lock([team_id for _, team_id in heads], skip_locked=True)
+    waiting = set(
+        Application.objects.select_for_update().filter(
+            pk__in=[pk for pk, team_id in heads if team_id in team_ids], status='waitlisted'
+        ).values_list('pk', flat=True)
+    )
+    promoted = [(pk, team_id) for pk, team_id in heads if pk in waiting][:max(free_slots(professor_id, lock=True), 0)]
+    if not promoted:
+        return deltas
+
+    now = timezone.now()
+    promoted_ids = [pk for pk, _ in promoted]
+    promoted_teams = [team_id for _, team_id in promoted]
+    Application.objects.filter(pk__in=promoted_ids).update(status='accepted', responded_at=now)
+    ProfessorProfile.objects.fill_slots({professor_id: len(promoted)})
+
+    siblings = list(
+        Application.objects.filter(team_id__in=promoted_teams, status__in=OPEN_STATUSES).values_list(
+            'pk', 'team_id', 'professor_id', 'status', 'professor__user__department'
+        )
+    )
+    if siblings:
+        Application.objects.filter(pk__in=[row[0] for row in siblings]).update(
+            status='withdrawn', responded_at=now
+        )
+
+    department = stats.professor_department(professor_id)
+    deltas.update(stats.transition_deltas('waitlisted', 'accepted', department, count=len(promoted)))
+    deltas.update({'slots:filled': len(promoted), 'teams:placed': len(promoted)})
+    for _, _, _, status, sibling_department in siblings:
+        deltas.update(stats.transition_deltas(status, 'withdrawn', sibling_department))
+
+    members = defaultdict(list)
+    for team_id, user_id in TeamMember.objects.filter(
+        team_id__in=promoted_teams, status='accepted'
+    ).values_list('team_id', 'user_id'):
+        members[team_id].append(user_id)
+
+    entries = []
+    for pk, team_id in promoted:
+        event = {'application_id': pk, 'team_id': team_id, 'professor_id': professor_id}
+        entries.append(('application.promoted', [*members[team_id], professor_id], event))
+        entries.append(('application.slot_filled', [professor_id], event))
+    for pk, team_id, sibling_professor_id, _, _ in siblings:
+        event = {'application_id': pk, 'team_id': team_id, 'professor_id': sibling_professor_id}
+        entries.append(('application.withdrawn', [sibling_professor_id], event))
+    publish_batch(entries)
+    return deltas
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Event
+
+
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'kind', 'created_at')
+    list_filter = ('kind', 'created_at')
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'kind', 'payload', 'created_at')
@@ -0,0 +1,48 @@
+"""
+Per-user event feed backed by the append-only Event table.
+
+Events are inserted in the same transaction as the status change they
+describe, so a rolled-back change never reaches a stream. Each user has a
+feed version in the shared cache that is bumped on commit; open streams
+compare it on every tick and only query the table when it moved. Without a
+shared cache the versions are per process, so streams query the table on
+every tick instead.
+"""
+
+from project_allocation.cache import bump_on_commit, get_version
+from .models import Event
+
+
+def _version_key(user_id):
+    return f'events:feed-version:{user_id}'
+
+
+def feed_version(user_id):
+    """Return the current feed version for a user"""
+    return get_version(_version_key(user_id))
+
+
+def publish(kind, user_ids, **payload):
+    """Append one event per recipient and wake their streams once the transaction commits"""
+    publish_batch([(kind, user_ids, payload)])
+
+
+def publish_batch(entries):
+    """Publish many (kind, user_ids, payload) entries with a single bulk insert"""
+    events = [
+        Event(user_id=user_id, kind=kind, payload=payload)
+        for kind, user_ids, payload in entries
+        for user_id in {user_id for user_id in user_ids if user_id is not None}
+    ]
+    if not events:
+        return
+
+    Event.objects.bulk_create(events, batch_size=1000)
+    bump_on_commit(*{_version_key(event.user_id) for event in events})
+
+
+def team_recipients(team_id):
+    """User ids of a team's accepted members"""
+    from teams.models import TeamMember
+
+    return TeamMember.objects.filter(team_id=team_id, status='accepted').values_list('user_id', flat=True)
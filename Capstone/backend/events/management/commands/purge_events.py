@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Delete delivered events older than the retention period in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--retention-days', type=int, default=settings.EVENT_RETENTION_DAYS,
+                            help='Keep events for this many days')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be deleted')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['retention_days'])
+        # Ids grow with created_at, so the newest old event bounds an id range
+        # that the primary key serves without an index on created_at
+        last_id = Event.objects.filter(created_at__lt=cutoff).order_by('-pk').values_list('pk', flat=True).first()
+        if last_id is None:
+            self.stdout.write(self.style.SUCCESS('No events to purge'))
+            return
+
+        old = Event.objects.filter(pk__lte=last_id)
+        if options['dry_run']:
+            self.stdout.write(f'Would purge {old.count()} events')
+            return
+
+        purged = 0
+        while True:
+            ids = list(old.order_by('pk').values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            with transaction.atomic():
+                purged += Event.objects.filter(pk__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} events'))
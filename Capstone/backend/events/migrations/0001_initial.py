@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('team.invited', 'Invited to a team'), ('team.invitation_accepted', 'Invitation accepted'), ('team.invitation_rejected', 'Invitation rejected'), ('application.submitted', 'Application submitted'), ('application.accepted', 'Application accepted'), ('application.rejected', 'Application rejected'), ('application.withdrawn', 'Application withdrawn'), ('application.slot_filled', 'Professor slot filled')], max_length=40)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Event',
+                'verbose_name_plural': 'Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['user', 'id'], name='event_user_id_idx')],
+            },
+        ),
+    ]
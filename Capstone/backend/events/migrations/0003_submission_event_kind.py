@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_waitlist_event_kinds'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='kind',
+            field=models.CharField(choices=[('team.invited', 'Invited to a team'), ('team.invitation_accepted', 'Invitation accepted'), ('team.invitation_rejected', 'Invitation rejected'), ('application.submitted', 'Application submitted'), ('application.submission_processed', 'Queued submission processed'), ('application.accepted', 'Application accepted'), ('application.rejected', 'Application rejected'), ('application.withdrawn', 'Application withdrawn'), ('application.waitlisted', 'Application waitlisted'), ('application.promoted', 'Application promoted from the waitlist'), ('application.slot_filled', 'Professor slot filled')], max_length=40),
+        ),
+    ]
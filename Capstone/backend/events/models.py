@@ -0,0 +1,37 @@
+from django.db import models
+from users.models import User
+
+
+class Event(models.Model):
+    """Append-only record of a status change delivered to one user's event stream"""
+    
+    KIND_CHOICES = [
+        ('team.invited', 'Invited to a team'),
+        ('team.invitation_accepted', 'Invitation accepted'),
+        ('team.invitation_rejected', 'Invitation rejected'),
+        ('application.submitted', 'Application submitted'),
+        ('application.submission_processed', 'Queued submission processed'),
+        ('application.accepted', 'Application accepted'),
+        ('application.rejected', 'Application rejected'),
+        ('application.withdrawn', 'Application withdrawn'),
+        ('application.waitlisted', 'Application waitlisted'),
+        ('application.promoted', 'Application promoted from the waitlist'),
+        ('application.slot_filled', 'Professor slot filled'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=40, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Event'
+        verbose_name_plural = 'Events'
+        ordering = ['id']
+        indexes = [
+            # Streams resume with user = ? AND id > last_event_id
+            models.Index(fields=['user', 'id'], name='event_user_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} -> {self.user.username}"
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'events'
+
+urlpatterns = [
+    path('events/stream/', views.event_stream, name='event-stream'),
+]
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from project_allocation import cache
+from users.models import User
+from .broker import feed_version
+from .models import Event
+
+
+def _token_user_id(request):
+    """User id from the bearer token, or from ?token= since EventSource cannot set headers"""
+    header = request.headers.get('Authorization', '')
+    raw = header[len('Bearer '):] if header.startswith('Bearer ') else request.GET.get('token')
+    if not raw:
+        return None
+    try:
+        return AccessToken(raw)[api_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+
+
+def _last_event_id(request):
+    """Resume point sent by a reconnecting EventSource, or None for a fresh stream"""
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _format(event):
+    data = json.dumps({'kind': event.kind, 'created_at': event.created_at.isoformat(), **event.payload})
+    return f'id: {event.pk}\nevent: {event.kind}\ndata: {data}\n\n'
+
+
+async def _stream(user_id, last_id):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.EVENT_STREAM_MAX_AGE
+    last_write = loop.time()
+    seen_version = None
+    # Feed versions bumped by other processes never reach a local cache, so
+    # without a shared one every tick reads the table by id instead
+    shared = cache.is_shared()
+
+    yield f'retry: {settings.EVENT_STREAM_RETRY_MS}\n\n'
+    while loop.time() < deadline:
+        version = await sync_to_async(feed_version)(user_id) if shared else None
+        if not shared or version != seen_version:
+            seen_version = version
+            events = Event.objects.filter(user_id=user_id, pk__gt=last_id).order_by('pk')
+            sent = 0
+            async for event in events[:settings.EVENT_STREAM_BATCH]:
+                last_id = event.pk
+                sent += 1
+                yield _format(event)
+            if sent:
+                last_write = loop.time()
+            if sent == settings.EVENT_STREAM_BATCH:
+                # More may be waiting; read again on the next tick
+                seen_version = None
+        if loop.time() - last_write >= settings.EVENT_STREAM_HEARTBEAT:
+            # Comment lines keep proxies from closing an idle connection
+            last_write = loop.time()
+            yield ': keepalive\n\n'
+        await asyncio.sleep(settings.EVENT_STREAM_POLL_INTERVAL)
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events stream of the caller's invitation and application events.
+
+    Needs an ASGI server. Streams close after EVENT_STREAM_MAX_AGE seconds and
+    the browser reconnects with Last-Event-ID, resuming where it left off.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    user_id = _token_user_id(request)
+    if user_id is None or not await User.objects.filter(pk=user_id, is_active=True).aexists():
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    last_id = _last_event_id(request)
+    if last_id is None:
+        # A fresh client has just loaded current state, so only new events matter
+        last_id = await Event.objects.filter(user_id=user_id).order_by('-pk').values_list(
+            'pk', flat=True
+        ).afirst() or 0
+
+    response = StreamingHttpResponse(_stream(user_id, last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
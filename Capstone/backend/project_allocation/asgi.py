@@ -1,5 +1,9 @@
 """
 ASGI config for project_allocation project.
+
+The Server-Sent Events stream at /api/events/stream/ is an async view and
+must be served through this application (e.g. with uvicorn or daphne);
+under WSGI the stream would be buffered instead of pushed.
 """
 
 import os
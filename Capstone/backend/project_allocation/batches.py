@@ -0,0 +1,31 @@
+"""
+Chunked reads and writes for jobs that touch many rows.
+
+chunks() splits id lists for IN (...) filters. in_batches() writes each
+batch in its own short transaction, so a large job never holds its locks
+for longer than one batch.
+"""
+
+from django.db import transaction
+
+# Keeps IN (...) lists below SQLite's bound-parameter limit
+CHUNK_SIZE = 900
+
+
+def chunks(items, size=CHUNK_SIZE):
+    """Split items into lists of at most size"""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def in_batches(queryset, batch_size, apply):
+    """Apply a set-based write in short transactions of at most batch_size rows; returns its total"""
+    total = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        # Re-apply the filter so rows that changed meanwhile are left alone
+        with transaction.atomic():
+            total += apply(queryset.filter(pk__in=ids))
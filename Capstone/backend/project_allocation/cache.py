@@ -0,0 +1,66 @@
+"""
+Helpers for state kept in the default cache.
+
+Version counters in the cache tell every server process when its in-memory
+copies (directory snapshots, cached users and claims, the round schedule,
+event feeds) went stale. That only works when the cache is shared between
+processes; a local-memory cache is private to each one, so its bumps never
+reach the others and callers have to fall back to the database.
+"""
+
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import transaction
+
+# Backends whose contents are not visible to other server processes
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared():
+    """True when the default cache is seen by every server process"""
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_BACKENDS
+
+
+def get_version(key):
+    """Return the version stored under key, seeding it if the cache lost it"""
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a reset never collides with an old version
+        version = time.time_ns()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_versions(*keys):
+    """Move the versions stored under keys so every process sees its copies are stale"""
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_on_commit(*keys):
+    """Bump the versions under keys once the current transaction commits"""
+    transaction.on_commit(lambda: bump_versions(*keys))
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if is_shared():
+        return []
+    return [checks.Warning(
+        'The default cache is local to each process.',
+        hint='Set CACHE_BACKEND to a shared backend such as Redis. Until then users and '
+             'their claims, the round schedule and the professor directory are read from '
+             'the database on every request and event streams query the Event table on '
+             'every tick.',
+        id='project_allocation.W001',
+    )]
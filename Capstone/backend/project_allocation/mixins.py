@@ -0,0 +1,22 @@
+"""
+Mixins shared by the API views of every app.
+"""
+
+
+class EagerLoadingMixin:
+    """
+    Apply the queryset shape declared by the view's serializer.
+
+    Serializers that nest related objects expose a setup_eager_loading(queryset)
+    classmethod returning the queryset with the select_related/prefetch_related
+    calls they need; views using this mixin apply it to every queryset they
+    serialize, so nested serialization never falls back to per-row queries.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return self.eager_load(queryset)
+
+    def eager_load(self, queryset):
+        setup = getattr(self.get_serializer_class(), 'setup_eager_loading', None)
+        return setup(queryset) if setup else queryset
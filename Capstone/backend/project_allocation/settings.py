@@ -35,6 +35,8 @@ INSTALLED_APPS = [
     'users',
     'teams',
     'applications',
+    'events',
+    'allocation',
 ]
 
 MIDDLEWARE = [
@@ -76,6 +78,20 @@ DATABASES = {
     }
 }
 
+# Cache
+# Point this at a shared backend (e.g. Redis) in production so that version
+# counters used to invalidate per-process snapshots are seen by every worker.
+# With the local-memory default, authentication re-reads users and claims,
+# phase checks re-read the round schedule and the professor directory is
+# served from the database on every request, and event streams poll the Event table
+# (see project_allocation/cache.py).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='project-allocation'),
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -92,6 +108,29 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Request threads per server process (e.g. gunicorn --threads). At most
+# LOGIN_CONCURRENCY of them hash login passwords at once, by default all but
+# one, so a login burst always leaves a thread for other requests. Up to
+# LOGIN_QUEUE_LIMIT more wait for a slot; logins beyond that, or that wait
+# longer than LOGIN_QUEUE_TIMEOUT, get a 503 with Retry-After. With a single
+# thread per process the bound does nothing (check users.W001).
+WEB_THREADS = config('WEB_THREADS', default=1, cast=int)
+LOGIN_CONCURRENCY = config('LOGIN_CONCURRENCY', default=max(WEB_THREADS - 1, 1), cast=int)
+# Waiting logins hold a thread too, so by default they may not take the last spare one
+LOGIN_QUEUE_LIMIT = config('LOGIN_QUEUE_LIMIT', default=max(WEB_THREADS - LOGIN_CONCURRENCY - 1, 0), cast=int)
+LOGIN_QUEUE_TIMEOUT = config('LOGIN_QUEUE_TIMEOUT', default=1, cast=float)
+LOGIN_RETRY_AFTER = config('LOGIN_RETRY_AFTER', default=2, cast=int)
+
+# Team invitations expire after this many hours; expired and rejected rows
+# are purged by the sweep_invitations command after the retention period
+TEAM_INVITATION_TTL_HOURS = config('TEAM_INVITATION_TTL_HOURS', default=72, cast=int)
+TEAM_INVITATION_RETENTION_DAYS = config('TEAM_INVITATION_RETENTION_DAYS', default=30, cast=int)
+
+# With the intake queue on, application submissions are recorded and answered
+# with 202; process_submissions creates them in arrival order in batches
+APPLICATION_INTAKE_QUEUE = config('APPLICATION_INTAKE_QUEUE', default=False, cast=bool)
+APPLICATION_INTAKE_BATCH = config('APPLICATION_INTAKE_BATCH', default=500, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -115,7 +154,7 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -129,6 +168,10 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Serve the professor directory from an in-memory snapshot rebuilt on write;
+# ignored unless the cache above is shared
+PROFESSOR_DIRECTORY_SNAPSHOT = config('PROFESSOR_DIRECTORY_SNAPSHOT', default=True, cast=bool)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -161,4 +204,25 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 
     'JTI_CLAIM': 'jti',
-} 
\ No newline at end of file
+}
+
+# Server-Sent Events stream at /api/events/stream/ (served under ASGI).
+# Open streams check the user's feed version every poll interval, or query
+# the Event table by id when the cache is not shared, and are closed after
+# the max age so clients reconnect with Last-Event-ID.
+EVENT_STREAM_POLL_INTERVAL = config('EVENT_STREAM_POLL_INTERVAL', default=1.0, cast=float)
+EVENT_STREAM_HEARTBEAT = config('EVENT_STREAM_HEARTBEAT', default=15, cast=int)
+EVENT_STREAM_MAX_AGE = config('EVENT_STREAM_MAX_AGE', default=300, cast=int)
+EVENT_STREAM_BATCH = 100
+EVENT_STREAM_RETRY_MS = 3000
+
+# Events older than this are deleted by the purge_events command; a client
+# resuming from an older Last-Event-ID simply misses them
+EVENT_RETENTION_DAYS = config('EVENT_RETENTION_DAYS', default=14, cast=int)
+
+# Rows each allocation statistic is spread over; more shards let more status
+# changes commit at once, at the cost of a slightly larger overview read
+STATISTIC_SHARDS = config('STATISTIC_SHARDS', default=8, cast=int)
+
+# Per-process cache of authenticated users and their role/team claims
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=4096, cast=int) 
\ No newline at end of file
@@ -11,6 +11,8 @@ urlpatterns = [
     path('api/', include('users.urls')),
     path('api/', include('teams.urls')),
     path('api/', include('applications.urls')),
+    path('api/', include('events.urls')),
+    path('api/', include('allocation.urls')),
 ]
 
 # Serve media files in development
@@ -4,8 +4,8 @@ from .models import Team, TeamMember
 
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
-    list_display = ('name', 'leader', 'member_count', 'is_full', 'created_at')
-    list_filter = ('created_at',)
+    list_display = ('name', 'leader', 'member_count', 'is_full', 'frozen_at', 'created_at')
+    list_filter = ('created_at', 'frozen_at')
     search_fields = ('name', 'leader__username', 'leader__first_name', 'leader__last_name')
     readonly_fields = ('member_count', 'is_full')
     
@@ -14,7 +14,7 @@ class TeamAdmin(admin.ModelAdmin):
             'fields': ('name', 'leader')
         }),
         ('Status', {
-            'fields': ('member_count', 'is_full')
+            'fields': ('member_count', 'is_full', 'frozen_at')
         }),
     )
 
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class TeamsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'teams' 
\ No newline at end of file
+    name = 'teams'
+
+    def ready(self):
+        from . import signals  # noqa: F401 
\ No newline at end of file
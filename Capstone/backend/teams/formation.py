@@ -0,0 +1,222 @@
+"""
+Batch team formation for students who are not in a team after the deadline.
+
+Candidates are loaded and locked with a handful of queries, packed per
+department in memory, and written back in bulk inside the same transaction.
+"""
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from allocation import stats
+from project_allocation.batches import chunks
+from project_allocation.exceptions import Conflict
+from users.claims import invalidate_claims
+from users.models import User
+from .models import Team, TeamMember, MAX_TEAM_SIZE
+
+MIXED_DEPARTMENT = None
+
+
+class FormationPlan:
+    """Result of packing students into existing and new teams"""
+
+    def __init__(self):
+        self.fills = defaultdict(list)
+        self.new_teams = []
+        # Students left without a team because too few remained to reach min_size
+        self.unplaced = []
+
+    @property
+    def placed(self):
+        return sum(len(ids) for ids in self.fills.values()) + sum(len(ids) for _, ids in self.new_teams)
+
+    def summary(self):
+        return {
+            'students_placed': self.placed,
+            'teams_filled': len(self.fills),
+            'teams_created': len(self.new_teams),
+            'students_unplaced': len(self.unplaced),
+        }
+
+    def as_dict(self):
+        return {
+            **self.summary(),
+            'fills': [{'team_id': team_id, 'user_ids': ids} for team_id, ids in self.fills.items()],
+            'new_teams': [{'department': dept, 'user_ids': ids} for dept, ids in self.new_teams],
+            'unplaced_user_ids': self.unplaced,
+        }
+
+
+def _split_evenly(user_ids, max_size):
+    """Split into the fewest groups of at most max_size with sizes differing by at most one"""
+    if not user_ids:
+        return []
+    groups = -(-len(user_ids) // max_size)
+    size, extra = divmod(len(user_ids), groups)
+    result, start = [], 0
+    for index in range(groups):
+        end = start + size + (1 if index < extra else 0)
+        result.append(user_ids[start:end])
+        start = end
+    return result
+
+
+def plan_formation(students, open_teams, max_size=MAX_TEAM_SIZE, min_size=2):
+    """
+    Pack students into teams.
+
+    students is a list of (user_id, department) and open_teams a list of
+    (team_id, department, free_seats). Students first top up under-filled
+    teams of their department, fullest teams first, then the rest are split
+    evenly into new teams. Students who would end up in a team smaller than
+    min_size are pooled into mixed-department teams; whoever is still left
+    below min_size stays unplaced.
+    """
+    plan = FormationPlan()
+
+    by_department = defaultdict(list)
+    for user_id, department in students:
+        by_department[department].append(user_id)
+
+    teams_by_department = defaultdict(list)
+    for team_id, department, free in open_teams:
+        if free > 0:
+            teams_by_department[department].append((free, team_id))
+
+    pooled = []
+    for department, user_ids in by_department.items():
+        # Fullest teams first so the fewest teams stay under-filled
+        for free, team_id in sorted(teams_by_department.get(department, [])):
+            if not user_ids:
+                break
+            plan.fills[team_id].extend(user_ids[:free])
+            user_ids = user_ids[free:]
+
+        for group in _split_evenly(user_ids, max_size):
+            if len(group) < min_size:
+                pooled.extend(group)
+            else:
+                plan.new_teams.append((department, group))
+
+    # Leftover students go into any remaining seats before forming mixed teams
+    remaining = sorted(
+        (free - len(plan.fills.get(team_id, [])), team_id)
+        for teams in teams_by_department.values() for free, team_id in teams
+    )
+    for free, team_id in remaining:
+        if not pooled:
+            break
+        if free > 0:
+            plan.fills[team_id].extend(pooled[:free])
+            pooled = pooled[free:]
+    for group in _split_evenly(pooled, max_size):
+        if len(group) < min_size:
+            plan.unplaced.extend(group)
+        else:
+            plan.new_teams.append((MIXED_DEPARTMENT, group))
+
+    return plan
+
+
+def load_candidates(lock=False, max_size=MAX_TEAM_SIZE):
+    """
+    Load unaffiliated students and teams below max_size with two queries.
+
+    With lock, the under-filled teams are locked so concurrent accepts wait
+    on claim_seat, and the students so nothing else updates them meanwhile.
+    """
+    students = User.objects.filter(role='student').exclude(
+        Exists(TeamMember.objects.filter(user=OuterRef('pk'), status='accepted'))
+    ).order_by('department', 'username')
+    teams = Team.objects.with_space().filter(accepted_member_count__lt=max_size).order_by('pk')
+    if lock:
+        teams = teams.select_for_update(of=('self',))
+        students = students.select_for_update()
+
+    open_teams = [
+        (team_id, department, max_size - count)
+        for team_id, department, count in teams.values_list(
+            'pk', 'leader__department', 'accepted_member_count'
+        )
+    ]
+    return list(students.values_list('pk', 'department')), open_teams
+
+
+def _team_names(count):
+    """Generate count unused team names"""
+    taken = set(Team.objects.filter(name__startswith='Auto Team ').values_list('name', flat=True))
+    names, number = [], 1
+    while len(names) < count:
+        name = f'Auto Team {number}'
+        if name not in taken:
+            names.append(name)
+        number += 1
+    return names
+
+
+def form_teams(dry_run=False, max_size=MAX_TEAM_SIZE, min_size=2):
+    """Plan and, unless dry_run, apply automatic team formation"""
+    if dry_run:
+        return plan_formation(*load_candidates(max_size=max_size), max_size=max_size, min_size=min_size)
+
+    try:
+        with transaction.atomic():
+            plan = plan_formation(
+                *load_candidates(lock=True, max_size=max_size), max_size=max_size, min_size=min_size
+            )
+            if plan.placed:
+                _apply(plan)
+    except IntegrityError:
+        # A student joined a team, or a team filled up, while the plan was written
+        raise Conflict('Team memberships changed while teams were being formed, please retry')
+    return plan
+
+
+def _apply(plan):
+    """Write a formation plan: new teams, memberships and settled invitations"""
+    now = timezone.now()
+    names = _team_names(len(plan.new_teams))
+    teams = [
+        Team(name=name, leader_id=user_ids[0], accepted_member_count=len(user_ids))
+        for name, (_, user_ids) in zip(names, plan.new_teams)
+    ]
+    Team.objects.bulk_create(teams, batch_size=1000)
+    # bulk_create skips the post_save signal that counts teams
+    stats.record({'teams:total': len(teams)})
+    if any(team.pk is None for team in teams):
+        team_ids = dict(Team.objects.filter(name__in=names).values_list('name', 'pk'))
+        for team in teams:
+            team.pk = team_ids[team.name]
+
+    placements = [
+        (team.pk, user_id)
+        for team, (_, user_ids) in zip(teams, plan.new_teams)
+        for user_id in user_ids
+    ] + [
+        (team_id, user_id)
+        for team_id, user_ids in plan.fills.items()
+        for user_id in user_ids
+    ]
+    user_ids = [user_id for _, user_id in placements]
+
+    # Existing invitation rows would collide with the new memberships
+    filled_ids = list(plan.fills)
+    for chunk in chunks(user_ids):
+        TeamMember.objects.filter(team_id__in=filled_ids, user_id__in=chunk).delete()
+    TeamMember.objects.bulk_create(
+        [
+            TeamMember(team_id=team_id, user_id=user_id, status='accepted', responded_at=now)
+            for team_id, user_id in placements
+        ],
+        batch_size=1000,
+    )
+    for chunk in chunks(user_ids):
+        TeamMember.objects.filter(user_id__in=chunk, status='pending').reject()
+    for chunk in chunks(filled_ids):
+        Team.objects.filter(pk__in=chunk).repair_member_counts()
+    invalidate_claims(*user_ids)
+
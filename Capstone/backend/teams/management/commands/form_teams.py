@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from project_allocation.exceptions import Conflict
+from teams.formation import form_teams
+from teams.models import MAX_TEAM_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Group students without a team into new or under-filled teams'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Print the plan without writing')
+        parser.add_argument('--max-size', type=int, default=MAX_TEAM_SIZE)
+        parser.add_argument('--min-size', type=int, default=2,
+                            help='Smallest single-department team before students are pooled')
+
+    def handle(self, *args, **options):
+        try:
+            plan = form_teams(
+                dry_run=options['dry_run'],
+                max_size=min(options['max_size'], MAX_TEAM_SIZE),
+                min_size=options['min_size'],
+            )
+        except Conflict as exc:
+            raise CommandError(str(exc.detail))
+        summary = plan.summary()
+        prefix = 'Would place' if options['dry_run'] else 'Placed'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {summary['students_placed']} students: "
+            f"{summary['teams_filled']} existing teams topped up, {summary['teams_created']} teams created"
+        ))
+        if summary['students_unplaced']:
+            self.stdout.write(self.style.WARNING(
+                f"{summary['students_unplaced']} students left without a team, too few for --min-size"
+            ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from teams.models import Team
+
+
+class Command(BaseCommand):
+    help = 'Recompute Team.accepted_member_count from accepted TeamMember rows'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            repaired = Team.objects.repair_member_counts()
+        self.stdout.write(self.style.SUCCESS(f'Repaired member counts for {repaired} teams'))
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from project_allocation.batches import in_batches
+from teams.models import TeamMember
+
+
+class Command(BaseCommand):
+    help = 'Expire stale team invitations and purge old expired or rejected rows in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--retention-days', type=int, default=settings.TEAM_INVITATION_RETENTION_DAYS,
+                            help='Keep expired and rejected invitations for this many days')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would change')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options['batch_size']
+
+        to_expire = TeamMember.objects.filter(status='pending', expires_at__lte=now)
+        to_purge = TeamMember.objects.filter(
+            status__in=['expired', 'rejected'],
+            responded_at__lt=now - timedelta(days=options['retention_days'])
+        )
+
+        if options['dry_run']:
+            self.stdout.write(
+                f'Would expire {to_expire.count()} invitations and purge {to_purge.count()} rows'
+            )
+            return
+
+        expired = in_batches(
+            to_expire, batch_size,
+            lambda rows: rows.expire()
+        )
+        # Rows expired above keep responded_at=now, so they are not purged yet
+        purged = in_batches(
+            to_purge, batch_size,
+            lambda rows: rows.delete()[0]
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Expired {expired} invitations, purged {purged} rows'))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_member_counts(apps, schema_editor):
+    Team = apps.get_model('teams', 'Team')
+    TeamMember = apps.get_model('teams', 'TeamMember')
+    Team.objects.update(accepted_member_count=Coalesce(Subquery(
+        TeamMember.objects.filter(team=OuterRef('pk'), status='accepted')
+        .order_by().values('team').annotate(count=Count('pk')).values('count')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='accepted_member_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, help_text='Denormalized count of accepted members, maintained by the team views'),
+        ),
+        migrations.RunPython(populate_member_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:54
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def resolve_duplicates(apps, schema_editor):
+    """
+    Settle rows the old races left behind, which the constraints below reject.
+
+    A user with several accepted memberships keeps the one in the team they
+    lead, or else the oldest; the others are marked rejected and the member
+    counts recounted. Leaders of several teams and teams over the size limit
+    cannot be settled without losing a team, so they are reported instead.
+    """
+    Team = apps.get_model('teams', 'Team')
+    TeamMember = apps.get_model('teams', 'TeamMember')
+
+    duplicated = TeamMember.objects.filter(status='accepted').values('user').annotate(
+        count=Count('pk')
+    ).filter(count__gt=1).values_list('user', flat=True)
+    dropped, teams = [], set()
+    for user_id in list(duplicated):
+        memberships = sorted(
+            TeamMember.objects.filter(user_id=user_id, status='accepted').values_list(
+                'pk', 'team_id', 'team__leader_id'
+            ),
+            key=lambda row: (row[2] != user_id, row[0]),
+        )
+        for pk, team_id, _ in memberships[1:]:
+            dropped.append(pk)
+            teams.add(team_id)
+    if dropped:
+        TeamMember.objects.filter(pk__in=dropped).update(status='rejected', responded_at=timezone.now())
+        Team.objects.filter(pk__in=teams).update(accepted_member_count=Coalesce(Subquery(
+            TeamMember.objects.filter(team=OuterRef('pk'), status='accepted')
+            .order_by().values('team').annotate(count=Count('pk')).values('count')
+        ), 0))
+
+    problems = []
+    leaders = Team.objects.values('leader').annotate(count=Count('pk')).filter(count__gt=1)
+    for row in leaders:
+        team_ids = list(Team.objects.filter(leader_id=row['leader']).order_by('pk').values_list('pk', flat=True))
+        problems.append(f"user {row['leader']} leads teams {team_ids}")
+    for team_id, count in Team.objects.filter(accepted_member_count__gt=4).values_list('pk', 'accepted_member_count'):
+        problems.append(f'team {team_id} has {count} accepted members')
+    if problems:
+        raise RuntimeError(
+            'Resolve these rows before adding the team constraints, e.g. by deleting or '
+            'reassigning a team or removing members: ' + '; '.join(problems)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0003_team_accepted_member_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='team',
+            constraint=models.UniqueConstraint(fields=('leader',), name='one_team_per_leader'),
+        ),
+        migrations.AddConstraint(
+            model_name='team',
+            constraint=models.CheckConstraint(check=models.Q(('accepted_member_count__lte', 4)), name='team_size_within_limit'),
+        ),
+        migrations.AddConstraint(
+            model_name='teammember',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'accepted')), fields=('user',), name='one_accepted_team_per_user'),
+        ),
+    ]
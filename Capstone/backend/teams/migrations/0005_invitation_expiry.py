@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:55
+
+from django.db import migrations, models
+import teams.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0004_team_membership_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teammember',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, default=teams.models.invitation_expiry, help_text='Pending invitations stop being valid after this time', null=True),
+        ),
+        migrations.AlterField(
+            model_name='teammember',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected'), ('expired', 'Expired')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(fields=['status', 'expires_at'], name='teammember_status_expiry_idx'),
+        ),
+    ]
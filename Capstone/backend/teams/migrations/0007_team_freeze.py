@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0006_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='frozen_at',
+            field=models.DateTimeField(blank=True, help_text='Set when team formation closed; members can no longer join or leave', null=True),
+        ),
+    ]
@@ -1,34 +1,163 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from events.broker import publish_batch
 from users.models import User
 
+MAX_TEAM_SIZE = 4
+
+
+class TeamQuerySet(models.QuerySet):
+    """QuerySet helpers for team capacity and locking"""
+    
+    def lock(self, team_ids, skip_locked=False):
+        """
+        Lock teams in pk order and return the ids that were locked.
+        
+        Every write to a team's applications locks the team first, before any
+        application row, so decisions, promotions and intake cannot deadlock.
+        """
+        return set(
+            self.select_for_update(skip_locked=skip_locked).filter(pk__in=team_ids).order_by('pk').values_list(
+                'pk', flat=True
+            )
+        )
+    
+    def with_space(self):
+        """Teams that can still take members: not full and not frozen"""
+        return self.filter(accepted_member_count__lt=MAX_TEAM_SIZE, frozen_at__isnull=True)
+    
+    def claim_seat(self, team_id):
+        """Take one seat with a conditional UPDATE; False if the team is full or frozen"""
+        return self.with_space().filter(pk=team_id).update(
+            accepted_member_count=F('accepted_member_count') + 1
+        ) == 1
+    
+    def adjust_member_count(self, team_id, delta):
+        """Atomically move a team's accepted member counter by delta"""
+        return self.filter(pk=team_id).update(accepted_member_count=F('accepted_member_count') + delta)
+    
+    def repair_member_counts(self):
+        """Recompute the counter from TeamMember rows for teams that drifted"""
+        actual = Coalesce(Subquery(
+            TeamMember.objects.filter(team=OuterRef('pk'), status='accepted')
+            .order_by().values('team').annotate(count=Count('pk')).values('count')
+        ), 0)
+        return self.annotate(actual=actual).exclude(
+            accepted_member_count=F('actual')
+        ).update(accepted_member_count=actual)
+
 
 class Team(models.Model):
     """Model for team formation"""
     
     name = models.CharField(max_length=100, unique=True)
     leader = models.ForeignKey(User, on_delete=models.CASCADE, related_name='led_teams')
+    accepted_member_count = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        help_text="Denormalized count of accepted members, maintained by the team views"
+    )
+    frozen_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Set when team formation closed; members can no longer join or leave"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TeamQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Team'
         verbose_name_plural = 'Teams'
+        constraints = [
+            models.UniqueConstraint(fields=['leader'], name='one_team_per_leader'),
+            models.CheckConstraint(
+                check=Q(accepted_member_count__lte=MAX_TEAM_SIZE),
+                name='team_size_within_limit'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.name} (Leader: {self.leader.username})"
     
     @property
     def member_count(self):
-        return self.members.filter(status='accepted').count()
+        return self.accepted_member_count
     
     @property
     def is_full(self):
-        return self.member_count >= 4
+        return self.member_count >= MAX_TEAM_SIZE
     
     def can_add_member(self):
         return not self.is_full
 
 
+def invitation_expiry():
+    return timezone.now() + timedelta(hours=settings.TEAM_INVITATION_TTL_HOURS)
+
+
+class TeamMemberQuerySet(models.QuerySet):
+    """QuerySet helpers for the invitation lifecycle"""
+    
+    def pending(self):
+        """Pending invitations that have not expired yet"""
+        return self.filter(status='pending', expires_at__gt=timezone.now())
+    
+    def stale(self):
+        """Expired invitations, whether or not the sweeper has marked them yet"""
+        return self.filter(Q(status='expired') | Q(status='pending', expires_at__lte=timezone.now()))
+    
+    def reject_pending(self, user_id, exclude_pk=None):
+        """Reject every other pending invitation of a user"""
+        return self.filter(user_id=user_id, status='pending').exclude(pk=exclude_pk).reject()
+    
+    def reject(self):
+        """Reject these invitations with one UPDATE and publish team.invitation_rejected for each"""
+        return self._close('rejected')
+    
+    def expire(self):
+        """Expire these invitations with one UPDATE and publish team.invitation_expired for each"""
+        return self._close('expired')
+    
+    def _close(self, status):
+        rows = list(self.select_for_update().values_list('pk', 'team_id', 'user_id'))
+        if not rows:
+            return 0
+        
+        closed = self.model.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+            status=status, responded_at=timezone.now()
+        )
+        
+        members = defaultdict(list)
+        for team_id, member_id in self.model.objects.filter(
+            team_id__in={team_id for _, team_id, _ in rows}, status='accepted'
+        ).values_list('team_id', 'user_id'):
+            members[team_id].append(member_id)
+        publish_batch([
+            (
+                f'team.invitation_{status}', [*members[team_id], user_id],
+                {'team_id': team_id, 'user_id': user_id, 'invitation_id': pk},
+            )
+            for pk, team_id, user_id in rows
+        ])
+        return closed
+    
+    def reopen(self):
+        """Turn stale invitations back into fresh pending ones"""
+        return self.update(
+            status='pending',
+            invited_at=timezone.now(),
+            responded_at=None,
+            expires_at=invitation_expiry()
+        )
+
+
 class TeamMember(models.Model):
     """Model for team membership with invitation system"""
     
@@ -36,6 +165,7 @@ class TeamMember(models.Model):
         ('pending', 'Pending'),
         ('accepted', 'Accepted'),
         ('rejected', 'Rejected'),
+        ('expired', 'Expired'),
     ]
     
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='members')
@@ -43,11 +173,32 @@ class TeamMember(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     invited_at = models.DateTimeField(auto_now_add=True)
     responded_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=invitation_expiry,
+        help_text="Pending invitations stop being valid after this time"
+    )
+    
+    objects = TeamMemberQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'Team Member'
         verbose_name_plural = 'Team Members'
         unique_together = ['team', 'user']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=Q(status='accepted'),
+                name='one_accepted_team_per_user'
+            ),
+        ]
+        indexes = [
+            # Membership and invitation lookups for a user by status
+            models.Index(fields=['user', 'status'], name='teammember_user_status_idx'),
+            # Used by the invitation sweeper to find expired pending rows
+            models.Index(fields=['status', 'expires_at'], name='teammember_status_expiry_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.team.name} ({self.status})" 
\ No newline at end of file
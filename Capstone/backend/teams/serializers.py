@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from django.db.models import Prefetch
+from events.broker import publish, publish_batch
 from users.models import User
-from .models import Team, TeamMember
+from .models import Team, TeamMember, MAX_TEAM_SIZE
 
 
 class UserBasicSerializer(serializers.ModelSerializer):
@@ -21,8 +23,13 @@ class TeamMemberSerializer(serializers.ModelSerializer):
         model = TeamMember
         fields = ('id', 'user', 'status', 'invited_at', 'responded_at', 'is_leader')
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.select_related('user', 'team')
+    
     def get_is_leader(self, obj):
-        return obj.team.leader == obj.user
+        # Compare ids so neither the leader nor the user row is loaded
+        return obj.team.leader_id == obj.user_id
 
 
 class TeamSerializer(serializers.ModelSerializer):
@@ -39,17 +46,24 @@ class TeamSerializer(serializers.ModelSerializer):
         model = Team
         fields = ('id', 'name', 'leader', 'members', 'member_count', 'is_full', 'can_invite', 'can_leave', 'created_at', 'updated_at')
     
+    @classmethod
+    def setup_eager_loading(cls, queryset, prefix=''):
+        # Members are prefetched from the team, which also caches member.team
+        return queryset.select_related(f'{prefix}leader').prefetch_related(
+            Prefetch(f'{prefix}members', queryset=TeamMember.objects.select_related('user'))
+        )
+    
     def get_can_invite(self, obj):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
-        return obj.leader == request.user and not obj.is_full
+        return obj.leader_id == request.user.id and not obj.is_full
     
     def get_can_leave(self, obj):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
-        return obj.leader != request.user
+        return obj.leader_id != request.user.id
 
 
 class TeamCreateSerializer(serializers.ModelSerializer):
@@ -96,26 +110,106 @@ class TeamInviteSerializer(serializers.Serializer):
         if TeamMember.objects.filter(user=user, status='accepted').exists():
             raise serializers.ValidationError("User is already in a team")
         
-        # Check if user already has a pending invitation from this team
-        existing_invitation = TeamMember.objects.filter(
-            team=team,
-            user=user,
-            status='pending'
-        ).first()
+        # Check if user already has a live invitation or has declined one
+        existing_invitation = TeamMember.objects.filter(team=team, user=user).first()
         
         if existing_invitation:
-            raise serializers.ValidationError("User already has a pending invitation from this team")
-        
-        # Create team membership
-        team_member = TeamMember.objects.create(
-            team=team,
-            user=user,
-            status='pending'
-        )
+            invitations = TeamMember.objects.filter(pk=existing_invitation.pk)
+            if not invitations.stale().exists():
+                if existing_invitation.status == 'pending':
+                    raise serializers.ValidationError("User already has a pending invitation from this team")
+                raise serializers.ValidationError("User has already responded to an invitation from this team")
+            
+            # Expired invitations are renewed in place
+            invitations.reopen()
+            existing_invitation.refresh_from_db()
+            team_member = existing_invitation
+        else:
+            # Create team membership
+            team_member = TeamMember.objects.create(
+                team=team,
+                user=user,
+                status='pending'
+            )
         
+        publish('team.invited', [user.id], team_id=team.id, team_name=team.name, invitation_id=team_member.id)
         return team_member
 
 
+class TeamBulkInviteSerializer(serializers.Serializer):
+    """Serializer for inviting several users with set-based validation"""
+    
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=50
+    )
+    
+    def validate_user_ids(self, value):
+        # Drop duplicates but keep the order the leader asked for
+        return list(dict.fromkeys(value))
+    
+    def create(self, validated_data):
+        team = self.context['team']
+        user_ids = validated_data['user_ids']
+        
+        roles = dict(User.objects.filter(id__in=user_ids).values_list('id', 'role'))
+        in_team = set(TeamMember.objects.filter(
+            user_id__in=user_ids,
+            status='accepted'
+        ).values_list('user_id', flat=True))
+        team_invitations = TeamMember.objects.filter(team=team, user_id__in=user_ids)
+        existing = dict(team_invitations.values_list('user_id', 'status'))
+        stale = set(team_invitations.stale().values_list('user_id', flat=True))
+        remaining = MAX_TEAM_SIZE - team.accepted_member_count
+        
+        results = []
+        invitations = []
+        renewed = []
+        for user_id in user_ids:
+            error = None
+            if user_id not in roles:
+                error = "User not found"
+            elif roles[user_id] != 'student':
+                error = "Can only invite students to teams"
+            elif user_id in in_team:
+                error = "User is already in a team"
+            elif existing.get(user_id) == 'pending' and user_id not in stale:
+                error = "User already has a pending invitation from this team"
+            elif user_id in existing and user_id not in stale:
+                error = "User has already responded to an invitation from this team"
+            elif len(invitations) + len(renewed) >= remaining:
+                error = "Team has no remaining capacity"
+            
+            if error:
+                results.append({'user_id': user_id, 'status': 'error', 'error': error})
+                continue
+            
+            # Expired invitations are renewed in place instead of duplicated
+            if user_id in stale:
+                renewed.append(user_id)
+            else:
+                invitations.append(TeamMember(team=team, user_id=user_id, status='pending'))
+            results.append({'user_id': user_id, 'status': 'invited'})
+        
+        TeamMember.objects.bulk_create(invitations)
+        if renewed:
+            TeamMember.objects.filter(team=team, user_id__in=renewed).reopen()
+        
+        # One event per invitee with the same payload as a single invite
+        invited = [invitation.user_id for invitation in invitations] + renewed
+        invitation_ids = dict(
+            TeamMember.objects.filter(team=team, user_id__in=invited).values_list('user_id', 'pk')
+        )
+        publish_batch([
+            ('team.invited', [user_id], {
+                'team_id': team.id, 'team_name': team.name, 'invitation_id': invitation_ids[user_id]
+            })
+            for user_id in invited
+        ])
+        return results
+
+
 class TeamResponseSerializer(serializers.ModelSerializer):
     """Serializer for responding to team invitations"""
     
@@ -147,4 +241,8 @@ class TeamMemberDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = TeamMember
-        fields = ('id', 'user', 'team_name', 'leader_name', 'status', 'invited_at', 'responded_at') 
\ No newline at end of file
+        fields = ('id', 'user', 'team_name', 'leader_name', 'status', 'invited_at', 'responded_at')
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.select_related('user', 'team__leader') 
\ No newline at end of file
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.claims import invalidate_claims
+from .models import TeamMember
+
+
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+def invalidate_member_claims(sender, instance, **kwargs):
+    """Team membership is part of the user's claims, so refresh them on change"""
+    invalidate_claims(instance.user_id)
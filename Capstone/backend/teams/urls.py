@@ -9,8 +9,11 @@ urlpatterns = [
     path('teams/my/', views.MyTeamView.as_view(), name='my-team'),
     path('teams/<int:pk>/', views.TeamDetailView.as_view(), name='team-detail'),
     path('teams/invite/', views.TeamInviteView.as_view(), name='team-invite'),
+    path('teams/invite/bulk/', views.TeamBulkInviteView.as_view(), name='team-bulk-invite'),
     path('teams/response/<int:pk>/', views.TeamResponseView.as_view(), name='team-response'),
     path('teams/invitations/', views.my_invitations, name='my-invitations'),
+    path('teams/auto-form/', views.auto_form_teams, name='auto-form-teams'),
     path('teams/leave/', views.leave_team, name='leave-team'),
     path('teams/members/<int:member_id>/remove/', views.remove_member, name='remove-member'),
+    path('students/available/', views.AvailableStudentListView.as_view(), name='available-students'),
 ] 
\ No newline at end of file
@@ -1,24 +1,36 @@
 from rest_framework import generics, permissions, status, serializers
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
 from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
 from django.utils import timezone
 
+from allocation.rounds import PhaseMixin
+from events.broker import publish, team_recipients
+from project_allocation.exceptions import Conflict
+from project_allocation.mixins import EagerLoadingMixin
+from users.claims import get_team_id
+from users.models import User
+from .formation import form_teams
 from .models import Team, TeamMember
 from .serializers import (
     TeamSerializer, 
     TeamCreateSerializer, 
     TeamInviteSerializer, 
+    TeamBulkInviteSerializer,
     TeamResponseSerializer,
-    TeamMemberSerializer
+    TeamMemberSerializer,
+    UserBasicSerializer
 )
 
 
-class TeamCreateView(generics.CreateAPIView):
+class TeamCreateView(PhaseMixin, generics.CreateAPIView):
     """API view for creating teams"""
     serializer_class = TeamCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    phase = 'formation'
     
     def perform_create(self, serializer):
         # Check if user is already a team leader
@@ -29,18 +41,23 @@ class TeamCreateView(generics.CreateAPIView):
         if TeamMember.objects.filter(user=self.request.user, status='accepted').exists():
             raise serializers.ValidationError("You are already in a team")
         
-        team = serializer.save()
-        
-        # Automatically add the leader as the first team member
-        TeamMember.objects.create(
-            team=team,
-            user=self.request.user,
-            status='accepted',
-            responded_at=timezone.now()
-        )
+        # The checks above are for friendly messages; constraints settle races
+        try:
+            with transaction.atomic():
+                team = serializer.save(accepted_member_count=1)
+                
+                # Automatically add the leader as the first team member
+                TeamMember.objects.create(
+                    team=team,
+                    user=self.request.user,
+                    status='accepted',
+                    responded_at=timezone.now()
+                )
+        except IntegrityError:
+            raise Conflict("You are already leading or in a team, or the team name is taken")
 
 
-class TeamDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TeamDetailView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """API view for team details"""
     serializer_class = TeamSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -49,7 +66,7 @@ class TeamDetailView(generics.RetrieveUpdateDestroyAPIView):
         user = self.request.user
         if user.role == 'student':
             # Students can only see their own team
-            return Team.objects.filter(members__user=user, members__status='accepted')
+            return Team.objects.filter(pk=get_team_id(user))
         else:
             # Teachers and admins can see all teams
             return Team.objects.all()
@@ -65,13 +82,17 @@ class TeamDetailView(generics.RetrieveUpdateDestroyAPIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        if team.frozen_at and user.role != 'admin':
+            return Response({'error': 'Team membership is frozen'}, status=status.HTTP_403_FORBIDDEN)
+        
         return super().destroy(request, *args, **kwargs)
 
 
-class TeamInviteView(generics.CreateAPIView):
+class TeamInviteView(PhaseMixin, generics.CreateAPIView):
     """API view for inviting team members"""
     serializer_class = TeamInviteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    phase = 'formation'
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -81,53 +102,116 @@ class TeamInviteView(generics.CreateAPIView):
     def get_team(self):
         team = get_object_or_404(Team, leader=self.request.user)
         return team
+    
+    def create(self, request, *args, **kwargs):
+        if self.get_team().frozen_at:
+            return Response({'error': 'Team membership is frozen'}, status=status.HTTP_403_FORBIDDEN)
+        return super().create(request, *args, **kwargs)
+    
+    def perform_create(self, serializer):
+        # The invitation and its event commit together
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise Conflict("User was invited by this team in a concurrent request")
+
+
+class TeamBulkInviteView(PhaseMixin, generics.GenericAPIView):
+    """API view for inviting several team members in one request"""
+    serializer_class = TeamBulkInviteSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    phase = 'formation'
+    
+    def post(self, request):
+        team = get_object_or_404(Team, leader=request.user)
+        if team.frozen_at:
+            return Response({'error': 'Team membership is frozen'}, status=status.HTTP_403_FORBIDDEN)
+        
+        serializer = self.get_serializer(data=request.data, context={'request': request, 'team': team})
+        serializer.is_valid(raise_exception=True)
+        
+        # The checks in the serializer are for friendly messages; the unique
+        # team/user constraint settles concurrent invites
+        try:
+            with transaction.atomic():
+                results = serializer.save()
+        except IntegrityError:
+            raise Conflict("Some of these users were invited by this team in a concurrent request")
+        
+        invited = any(result['status'] == 'invited' for result in results)
+        return Response(
+            {'results': results},
+            status=status.HTTP_201_CREATED if invited else status.HTTP_400_BAD_REQUEST
+        )
 
 
-class TeamResponseView(generics.UpdateAPIView):
+class TeamResponseView(PhaseMixin, generics.UpdateAPIView):
     """API view for responding to team invitations"""
     serializer_class = TeamResponseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    phase = 'formation'
     
     def get_queryset(self):
-        return TeamMember.objects.filter(user=self.request.user, status='pending')
+        return TeamMember.objects.pending().filter(user=self.request.user)
     
     def update(self, request, *args, **kwargs):
-        with transaction.atomic():
-            instance = self.get_object()
-            
-            # If accepting, check if user is already in another team
-            if request.data.get('status') == 'accepted':
-                existing_team = TeamMember.objects.filter(
-                    user=request.user, 
-                    status='accepted'
-                ).first()
+        try:
+            with transaction.atomic():
+                instance = self.get_object()
+                
+                # If accepting, take a seat with a conditional UPDATE so
+                # concurrent accepts cannot overfill or join a frozen team
+                if request.data.get('status') == 'accepted':
+                    if instance.team.frozen_at:
+                        return Response(
+                            {'error': 'Team membership is frozen'}, 
+                            status=status.HTTP_403_FORBIDDEN
+                        )
+                    if not Team.objects.claim_seat(instance.team_id):
+                        return Response(
+                            {'error': 'Team is already full'}, 
+                            status=status.HTTP_409_CONFLICT
+                        )
+                
+                response = super().update(request, *args, **kwargs)
+                
+                # Joining a team settles every other invitation the user holds
+                if response.data['status'] == 'accepted':
+                    TeamMember.objects.reject_pending(request.user.id, exclude_pk=instance.pk)
                 
-                if existing_team:
-                    return Response(
-                        {'error': 'You are already in a team'}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            return super().update(request, *args, **kwargs)
+                publish(
+                    f"team.invitation_{response.data['status']}",
+                    [*team_recipients(instance.team_id), request.user.id],
+                    team_id=instance.team_id, user_id=request.user.id, invitation_id=instance.pk
+                )
+                
+                return response
+        except IntegrityError:
+            # One accepted membership per user is enforced by a partial unique index
+            return Response(
+                {'error': 'You are already in a team'}, 
+                status=status.HTTP_409_CONFLICT
+            )
 
 
-class MyTeamView(generics.RetrieveAPIView):
+class MyTeamView(EagerLoadingMixin, generics.RetrieveAPIView):
     """API view for getting current user's team"""
     serializer_class = TeamSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
         user = self.request.user
+        teams = self.eager_load(Team.objects.all())
         if user.role == 'student':
             # Get team where user is a member
-            team_member = get_object_or_404(TeamMember, user=user, status='accepted')
-            return team_member.team
+            return get_object_or_404(teams, pk=get_team_id(user))
         else:
             # Get team where user is leader
-            return get_object_or_404(Team, leader=user)
+            return get_object_or_404(teams, leader=user)
 
 
-class TeamListView(generics.ListAPIView):
+class TeamListView(EagerLoadingMixin, generics.ListAPIView):
     """API view for listing teams (admin/teacher only)"""
     serializer_class = TeamSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -135,19 +219,85 @@ class TeamListView(generics.ListAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.role in ['admin', 'teacher']:
-            return Team.objects.all().prefetch_related('members__user')
+            queryset = Team.objects.all()
+            if self.request.query_params.get('has_space') in ('true', '1'):
+                queryset = queryset.with_space()
+            return queryset
         else:
             return Team.objects.none()
 
 
+class AvailableStudentPagination(CursorPagination):
+    """Keyset pagination over the unique username column"""
+    ordering = 'username'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class AvailableStudentListView(generics.ListAPIView):
+    """API view for team leaders finding students who are not yet in a team"""
+    serializer_class = UserBasicSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = AvailableStudentPagination
+    filter_backends = []
+    
+    def list(self, request, *args, **kwargs):
+        user = request.user
+        if user.role != 'admin' and not Team.objects.filter(leader=user).exists():
+            return Response(
+                {'error': 'Only team leaders can search for available students'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return super().list(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        # Anti-joins against TeamMember rather than loading memberships
+        queryset = User.objects.filter(role='student').exclude(
+            Exists(TeamMember.objects.filter(user=OuterRef('pk'), status='accepted'))
+        )
+        
+        team_id = get_team_id(self.request.user)
+        if team_id is not None:
+            queryset = queryset.exclude(
+                Exists(TeamMember.objects.pending().filter(user=OuterRef('pk'), team_id=team_id))
+            )
+        
+        department = self.request.query_params.get('department')
+        if department:
+            queryset = queryset.filter(department=department)
+        
+        name = self.request.query_params.get('name')
+        if name:
+            queryset = queryset.filter(
+                Q(username__istartswith=name) |
+                Q(first_name__istartswith=name) |
+                Q(last_name__istartswith=name)
+            )
+        
+        return queryset
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def auto_form_teams(request):
+    """Group unaffiliated students into teams (admin only)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('true', '1')
+    plan = form_teams(dry_run=dry_run)
+    
+    return Response(plan.as_dict() if dry_run else plan.summary())
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def my_invitations(request):
     """Get current user's pending team invitations"""
-    invitations = TeamMember.objects.filter(
-        user=request.user, 
-        status='pending'
-    ).select_related('team', 'team__leader')
+    invitations = TeamMemberSerializer.setup_eager_loading(
+        TeamMember.objects.pending().filter(user=request.user)
+    )
     
     serializer = TeamMemberSerializer(invitations, many=True)
     return Response(serializer.data)
@@ -170,7 +320,12 @@ def leave_team(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        team_member.delete()
+        if team.frozen_at:
+            return Response({'error': 'Team membership is frozen'}, status=status.HTTP_403_FORBIDDEN)
+        
+        with transaction.atomic():
+            team_member.delete()
+            Team.objects.adjust_member_count(team.pk, -1)
         return Response({'message': 'Successfully left the team'})
         
     except TeamMember.DoesNotExist:
@@ -204,7 +359,13 @@ def remove_member(request, member_id):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        team_member.delete()
+        if team.frozen_at and user.role != 'admin':
+            return Response({'error': 'Team membership is frozen'}, status=status.HTTP_403_FORBIDDEN)
+        
+        with transaction.atomic():
+            team_member.delete()
+            if team_member.status == 'accepted':
+                Team.objects.adjust_member_count(team.pk, -1)
         return Response({'message': 'Member removed successfully'})
         
     except TeamMember.DoesNotExist:
@@ -190,6 +190,9 @@ def create_sample_data():
                 )
                 print(f"Created pending invitation for {student.get_full_name()} to join {team_gamma.name}")
     
+    # Members were added directly, so bring the denormalized counters in line
+    Team.objects.repair_member_counts()
+    
     print("\nSample data creation completed!")
     print("\nTest accounts created:")
     print("Students:")
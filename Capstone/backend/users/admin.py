@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, ProfessorProfile
+from .models import User, ProfessorProfile, ResearchDomain
 
 
 @admin.register(User)
@@ -19,18 +19,25 @@ class CustomUserAdmin(UserAdmin):
     )
 
 
+@admin.register(ResearchDomain)
+class ResearchDomainAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
+
+
 @admin.register(ProfessorProfile)
 class ProfessorProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'research_domains', 'total_slots', 'filled_slots', 'available_slots')
-    list_filter = ('total_slots',)
+    list_filter = ('total_slots', 'domains')
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 'research_domains')
-    readonly_fields = ('available_slots',)
+    readonly_fields = ('available_slots', 'domains')
     
     fieldsets = (
         ('Professor Info', {
             'fields': ('user', 'bio')
         }),
         ('Research & Slots', {
-            'fields': ('research_domains', 'total_slots', 'filled_slots', 'available_slots')
+            'fields': ('research_domains', 'domains', 'total_slots', 'filled_slots', 'available_slots', 'waitlist_size')
         }),
     ) 
\ No newline at end of file
@@ -3,4 +3,9 @@ from django.apps import AppConfig
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'users' 
\ No newline at end of file
+    name = 'users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from project_allocation import cache  # noqa: F401 registers the shared cache check
+        from . import login_pool  # noqa: F401 registers the login threads check
\ No newline at end of file
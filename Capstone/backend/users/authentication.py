@@ -0,0 +1,91 @@
+import copy
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from project_allocation import cache
+from .claims import VERSION_CLAIM, claims_from_token, claims_version, resolve_claims
+
+
+class UserCache:
+    """Small per-process LRU of authenticated users keyed by id and claims version"""
+
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, user_id, version):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[0] != version:
+                return None
+            self.entries.move_to_end(user_id)
+            return entry[1]
+
+    def set(self, user_id, version, user):
+        with self.lock:
+            self.entries[user_id] = (version, user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves users from a per-process cache.
+
+    The cached user carries role, team and professor claims. Entries are only
+    used while the user's claims version in the shared cache is unchanged, so
+    role or membership changes take effect on the next request. Without a
+    shared cache another process's version bump would go unseen, so every
+    request reloads the user and claims from the database instead.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if not cache.is_shared():
+            return self.load_user(user_id, validated_token, None)
+
+        version = claims_version(user_id)
+        user = user_cache.get(user_id, version)
+        if user is None:
+            user = self.load_user(user_id, validated_token, version)
+            user_cache.set(user_id, version, user)
+
+        # Hand every request its own copy so in-place edits never leak
+        user = copy.copy(user)
+        user.claims = dict(user.claims)
+        return user
+
+    def load_user(self, user_id, validated_token, version):
+        try:
+            user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        # Token claims are only trusted if nothing changed since they were issued
+        claims = None
+        if version is not None and validated_token.get(VERSION_CLAIM) == version:
+            claims = claims_from_token(validated_token)
+        user.claims = claims or resolve_claims(user)
+        return user
@@ -0,0 +1,75 @@
+"""
+Role, team and professor-profile claims for authenticated users.
+
+Claims are stamped into access tokens at login and attached to request.user
+by CachedJWTAuthentication. Each user has a claims version in the shared
+cache; anything that changes a user's role or team membership bumps it so
+stale tokens and cached users are re-resolved from the database.
+"""
+
+from django.db.models import Exists, OuterRef, Subquery
+
+from project_allocation.cache import bump_on_commit, get_version
+from .models import User, ProfessorProfile
+
+CLAIM_NAMES = ('role', 'team_id', 'professor_id')
+VERSION_CLAIM = 'claims_version'
+
+
+def _version_key(user_id):
+    return f'users:claims-version:{user_id}'
+
+
+def claims_version(user_id):
+    """Return the current claims version for a user"""
+    return get_version(_version_key(user_id))
+
+
+def invalidate_claims(*user_ids):
+    """Bump the claims version of the given users once the transaction commits"""
+    bump_on_commit(*[_version_key(user_id) for user_id in user_ids])
+
+
+def resolve_claims(user):
+    """Load a user's claims from the database with a single query"""
+    from teams.models import TeamMember
+
+    row = User.objects.filter(pk=user.pk).annotate(
+        team_id=Subquery(
+            TeamMember.objects.filter(user=OuterRef('pk'), status='accepted').values('team_id')[:1]
+        ),
+        has_profile=Exists(ProfessorProfile.objects.filter(user=OuterRef('pk'))),
+    ).values('role', 'team_id', 'has_profile').first()
+
+    if row is None:
+        return {'role': user.role, 'team_id': None, 'professor_id': None}
+    return {
+        'role': row['role'],
+        'team_id': row['team_id'],
+        'professor_id': user.pk if row['has_profile'] else None,
+    }
+
+
+def claims_from_token(token):
+    """Return the claims carried by a token, or None if they are missing"""
+    if any(name not in token for name in CLAIM_NAMES):
+        return None
+    return {name: token[name] for name in CLAIM_NAMES}
+
+
+def get_claims(user):
+    """Return the claims attached to a user, resolving and caching them if needed"""
+    claims = getattr(user, 'claims', None)
+    if claims is None:
+        claims = user.claims = resolve_claims(user)
+    return claims
+
+
+def get_team_id(user):
+    """Id of the team in which the user is an accepted member, or None"""
+    return get_claims(user)['team_id']
+
+
+def get_professor_id(user):
+    """Primary key of the user's ProfessorProfile, or None"""
+    return get_claims(user)['professor_id']
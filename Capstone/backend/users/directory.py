@@ -0,0 +1,142 @@
+"""
+Precomputed, already-serialized professor directory served from process memory.
+
+Every worker keeps its own snapshot and compares it against a shared version
+number stored in the cache; writes to professors bump the version so workers
+rebuild their copy on the next read. When the cache is local to each process
+those bumps never reach the other workers, so the directory is served from
+the database instead.
+"""
+
+import threading
+
+from django.conf import settings
+from django.utils.text import slugify
+
+from project_allocation.cache import bump_on_commit, get_version, is_shared
+from .models import ProfessorProfile, ResearchDomain
+from .serializers import ProfessorProfileSerializer
+
+VERSION_CACHE_KEY = 'users:professor-directory:version'
+
+# Maps the ordering fields accepted by ProfessorListView to snapshot sort keys
+ORDERING_KEYS = {
+    'user__first_name': lambda entry: (entry['user']['first_name'] or '').lower(),
+    'user__last_name': lambda entry: (entry['user']['last_name'] or '').lower(),
+    'total_slots': lambda entry: entry['total_slots'],
+    'filled_slots': lambda entry: entry['filled_slots'],
+}
+
+SEARCH_KEYS = ('first_name', 'last_name', 'username')
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def enabled():
+    """True when the directory may be served from the in-memory snapshot"""
+    return settings.PROFESSOR_DIRECTORY_SNAPSHOT and is_shared()
+
+
+def current_version():
+    """Return the shared directory version"""
+    return get_version(VERSION_CACHE_KEY)
+
+
+def invalidate():
+    """Mark every worker's snapshot stale once the current transaction commits"""
+    bump_on_commit(VERSION_CACHE_KEY)
+
+
+def get_snapshot():
+    """Return this worker's snapshot, rebuilding it if the shared version moved"""
+    global _snapshot
+    version = current_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = DirectorySnapshot.build(version)
+        return _snapshot
+
+
+class DirectorySnapshot:
+    """Serialized professor directory with the metadata needed to filter it"""
+
+    def __init__(self, version, entries, domain_slugs=()):
+        self.version = version
+        self.entries = entries
+        # Every known domain, so unknown filters fail like the database path
+        self.domain_slugs = frozenset(domain_slugs)
+        self.by_pk = {entry['user']['id']: entry for entry in entries}
+        self._meta = {
+            entry['user']['id']: {
+                'department': entry['user']['department'],
+                'domains': {domain['slug'] for domain in entry['domains']},
+                'search': [(entry['user'][key] or '').lower() for key in SEARCH_KEYS],
+            }
+            for entry in entries
+        }
+
+    @classmethod
+    def build(cls, version):
+        queryset = ProfessorProfile.objects.select_related('user').prefetch_related('domains').order_by('pk')
+        domain_slugs = ResearchDomain.objects.values_list('slug', flat=True)
+        return cls(version, ProfessorProfileSerializer(queryset, many=True).data, domain_slugs)
+
+    def get(self, pk):
+        return self.by_pk.get(pk)
+
+    def filter(self, department=None, domains=None, search=None, ordering=None):
+        """Apply the same filters as the database-backed directory, in memory"""
+        domains = set(domains or ())
+        terms = (search or '').replace(',', ' ').lower().split()
+
+        results = []
+        for entry in self.entries:
+            meta = self._meta[entry['user']['id']]
+            if department and meta['department'] != department:
+                continue
+            if domains and not domains & meta['domains']:
+                continue
+            if terms and not all(self._matches(meta, term) for term in terms):
+                continue
+            results.append(entry)
+
+        # Stable sorts applied from the least to the most significant field
+        for field in reversed(ordering or []):
+            key = ORDERING_KEYS[field.lstrip('-')]
+            results.sort(key=key, reverse=field.startswith('-'))
+
+        return results
+
+    @staticmethod
+    def _matches(meta, term):
+        # Same rule as ProfessorSearchFilter: substring of a name, or domain slug prefix
+        if any(term in value for value in meta['search']):
+            return True
+        slug = slugify(term)
+        return bool(slug) and any(domain.startswith(slug) for domain in meta['domains'])
+
+    def facets(self, entries):
+        """Per-domain and per-department counts over already filtered entries"""
+        domains = {}
+        departments = {}
+        for entry in entries:
+            for domain in entry['domains']:
+                bucket = domains.setdefault(
+                    domain['slug'], {'key': domain['slug'], 'label': domain['name'], 'count': 0}
+                )
+                bucket['count'] += 1
+            department = entry['user']['department']
+            bucket = departments.setdefault(
+                department, {'key': department, 'label': department, 'count': 0}
+            )
+            bucket['count'] += 1
+
+        facets = {'domains': list(domains.values()), 'departments': list(departments.values())}
+        for bucket in facets.values():
+            bucket.sort(key=lambda item: (-item['count'], item['label'] or ''))
+        return facets
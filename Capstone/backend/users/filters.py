@@ -0,0 +1,78 @@
+import operator
+from functools import reduce
+
+import django_filters
+from django.db.models import Count, F, Q, Value
+from django.utils.text import slugify
+from rest_framework.filters import SearchFilter
+
+from .models import ProfessorProfile, ResearchDomain
+
+
+class ProfessorFilter(django_filters.FilterSet):
+    """Filter set for the professor directory backed by indexed lookups"""
+
+    department = django_filters.CharFilter(field_name='user__department')
+    domain = django_filters.ModelMultipleChoiceFilter(
+        field_name='domains__slug',
+        to_field_name='slug',
+        queryset=ResearchDomain.objects.all(),
+    )
+
+    class Meta:
+        model = ProfessorProfile
+        fields = ['user__department', 'department', 'domain']
+
+
+class ProfessorSearchFilter(SearchFilter):
+    """
+    Search over the view's search_fields plus research domains.
+
+    A term matches a domain when the domain's slug starts with the slugified
+    term, so domains are found through the unique slug index and the join
+    table instead of scanning every professor's domain names.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        lookups = [self.construct_search(field) for field in self.get_search_fields(view, request) or []]
+        conditions = []
+        for term in terms:
+            queries = [Q(**{lookup: term}) for lookup in lookups]
+            slug = slugify(term)
+            if slug:
+                queries.append(Q(pk__in=ProfessorProfile.domains.through.objects.filter(
+                    researchdomain__slug__startswith=slug
+                ).values('professorprofile_id')))
+            conditions.append(reduce(operator.or_, queries, Q(pk__in=[])))
+        return queryset.filter(reduce(operator.and_, conditions))
+
+
+def professor_facets(queryset):
+    """Per-domain and per-department professor counts for a queryset in one query"""
+    base = ProfessorProfile.objects.filter(pk__in=queryset.values('pk')).order_by()
+
+    by_domain = base.filter(domains__isnull=False).annotate(
+        facet=Value('domain'),
+        key=F('domains__slug'),
+        label=F('domains__name'),
+    ).values('facet', 'key', 'label').annotate(count=Count('pk'))
+
+    by_department = base.annotate(
+        facet=Value('department'),
+        key=F('user__department'),
+        label=F('user__department'),
+    ).values('facet', 'key', 'label').annotate(count=Count('pk'))
+
+    facets = {'domains': [], 'departments': []}
+    for row in by_domain.union(by_department, all=True):
+        bucket = facets['domains'] if row['facet'] == 'domain' else facets['departments']
+        bucket.append({'key': row['key'], 'label': row['label'], 'count': row['count']})
+
+    for bucket in facets.values():
+        bucket.sort(key=lambda item: (-item['count'], item['label'] or ''))
+
+    return facets
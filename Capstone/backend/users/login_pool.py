@@ -0,0 +1,153 @@
+"""
+Admission control for login password verification.
+
+Password hashing is deliberately slow, so a burst of logins can occupy every
+request thread. Each process lets only a fixed number of logins run
+authenticate() at once, leaving the remaining threads for other requests.
+A few more may wait briefly for a slot; logins beyond that, or that cannot
+get a slot within the wait, are turned away with a retry hint instead of
+piling up behind the hasher.
+
+The bound is per process, so it only protects anything when a process runs
+more request threads than login slots; a deploy check warns otherwise.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.contrib.auth import authenticate
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class LoginBusy(APIException):
+    """Raised when every login slot of this process is taken"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins in progress, please retry shortly.'
+    default_code = 'login_busy'
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+
+class LoginPool:
+    """Bounded login slots with admission control and timing metrics"""
+
+    def __init__(self, slots, queue_limit, timeout, retry_after):
+        self.slots = threading.BoundedSemaphore(slots)
+        self.capacity = slots
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {
+            'admitted': 0,
+            'rejected': 0,
+            'queue_wait_total': 0.0,
+            'queue_wait_max': 0.0,
+            'hash_time_total': 0.0,
+            'hash_time_max': 0.0,
+            'completed': 0,
+        }
+
+    def authenticate(self, request, username, password):
+        """
+        Run the configured auth backends for one login inside a slot.
+
+        Going through authenticate() keeps backend checks such as
+        user_can_authenticate, the user_login_failed signal and password
+        hash upgrades.
+        """
+        queued_at = time.monotonic()
+        if not self.slots.acquire(blocking=False) and not self._wait():
+            with self.lock:
+                self.stats['rejected'] += 1
+            raise LoginBusy(self.retry_after)
+
+        started = time.monotonic()
+        with self.lock:
+            self.in_flight += 1
+            self.stats['admitted'] += 1
+        try:
+            return authenticate(request, username=username, password=password)
+        finally:
+            finished = time.monotonic()
+            self.slots.release()
+            self._record(started - queued_at, finished - started)
+
+    def _wait(self):
+        """Wait for a slot unless queue_limit logins are already waiting; True once one is taken"""
+        with self.lock:
+            if self.waiting >= self.queue_limit:
+                return False
+            self.waiting += 1
+        try:
+            return self.slots.acquire(timeout=self.timeout)
+        finally:
+            with self.lock:
+                self.waiting -= 1
+
+    def _record(self, queue_wait, hash_time):
+        with self.lock:
+            stats = self.stats
+            self.in_flight -= 1
+            stats['completed'] += 1
+            stats['queue_wait_total'] += queue_wait
+            stats['queue_wait_max'] = max(stats['queue_wait_max'], queue_wait)
+            stats['hash_time_total'] += hash_time
+            stats['hash_time_max'] = max(stats['hash_time_max'], hash_time)
+
+    def metrics(self):
+        with self.lock:
+            stats = dict(self.stats)
+            in_flight = self.in_flight
+            waiting = self.waiting
+        completed = stats.pop('completed') or 1
+        return {
+            'in_flight': in_flight,
+            'capacity': self.capacity,
+            'waiting': waiting,
+            'queue_limit': self.queue_limit,
+            'admitted': stats['admitted'],
+            'rejected': stats['rejected'],
+            'queue_wait_avg_ms': round(stats['queue_wait_total'] / completed * 1000, 2),
+            'queue_wait_max_ms': round(stats['queue_wait_max'] * 1000, 2),
+            'hash_time_avg_ms': round(stats['hash_time_total'] / completed * 1000, 2),
+            'hash_time_max_ms': round(stats['hash_time_max'] * 1000, 2),
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_login_pool():
+    """Return this process's login slots, creating them on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = LoginPool(
+                    slots=settings.LOGIN_CONCURRENCY,
+                    queue_limit=settings.LOGIN_QUEUE_LIMIT,
+                    timeout=settings.LOGIN_QUEUE_TIMEOUT,
+                    retry_after=settings.LOGIN_RETRY_AFTER,
+                )
+    return _pool
+
+
+@checks.register(deploy=True)
+def check_login_threads(app_configs, **kwargs):
+    if settings.LOGIN_CONCURRENCY < settings.WEB_THREADS:
+        return []
+    return [checks.Warning(
+        'Login admission control has no effect: LOGIN_CONCURRENCY is not below WEB_THREADS.',
+        hint='Run at least two request threads per process (e.g. gunicorn --threads) and set '
+             'WEB_THREADS to match, so a login burst cannot occupy every thread of a worker.',
+        id='users.W001',
+    )]
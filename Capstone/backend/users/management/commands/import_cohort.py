@@ -0,0 +1,271 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from allocation import stats
+from applications.models import Application, ApplicationSubmission
+from users import directory
+from users.claims import invalidate_claims
+from users.models import User, ProfessorProfile, ResearchDomain, parse_research_domains
+
+USER_FIELDS = ('email', 'first_name', 'last_name', 'role', 'phone_number', 'department')
+PROFILE_FIELDS = ('research_domains', 'bio', 'total_slots')
+ROLES = {role for role, _ in User.ROLE_CHOICES}
+
+
+def _init_worker(settings_module):
+    """Configure Django in pool workers started with the spawn method"""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _hash_password(raw_password):
+    return make_password(raw_password)
+
+
+class Command(BaseCommand):
+    help = 'Import or update students and professors from a CSV file in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='CSV with a header row; username is required')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes used for password hashing')
+        parser.add_argument('--default-password', default=None,
+                            help='Password for new users whose row has none')
+        parser.add_argument('--update-passwords', action='store_true',
+                            help='Re-hash passwords of existing users from the file')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate and report changes without writing')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.totals = dict(created=0, updated=0, unchanged=0, errors=0)
+
+        try:
+            handle = open(options['csv_file'], newline='', encoding='utf-8-sig')
+        except OSError as exc:
+            raise CommandError(f"Cannot open {options['csv_file']}: {exc}")
+
+        # A dry run hashes nothing, so it does not start the process pool
+        pool = nullcontext() if options['dry_run'] else ProcessPoolExecutor(
+            max_workers=max(options['workers'], 1),
+            initializer=_init_worker,
+            initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'project_allocation.settings'),),
+        )
+        with handle, pool:
+            self.pool = pool
+            reader = csv.DictReader(handle)
+            if not reader.fieldnames or 'username' not in reader.fieldnames:
+                raise CommandError('CSV header must include a username column')
+
+            # Line numbers start at 2 because line 1 is the header
+            rows = enumerate(reader, start=2)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                self.import_batch(batch)
+                processed = sum(self.totals.values())
+                self.stdout.write(
+                    f"{processed} rows: {self.totals['created']} created, "
+                    f"{self.totals['updated']} updated, {self.totals['unchanged']} unchanged, "
+                    f"{self.totals['errors']} errors"
+                )
+
+        if not options['dry_run']:
+            directory.invalidate()
+            # Bulk writes skip the slot counters, so recount them from the tables
+            stats.rebuild()
+
+        style = self.style.WARNING if self.totals['errors'] else self.style.SUCCESS
+        self.stdout.write(style('Import finished' + (' (dry run)' if options['dry_run'] else '')))
+
+    def error(self, line, message):
+        self.totals['errors'] += 1
+        self.stderr.write(f'line {line}: {message}')
+
+    def clean_row(self, line, row):
+        """Return normalized user and profile values or None when the row is invalid"""
+        row = {key: (value or '').strip() for key, value in row.items() if key}
+        username = row.get('username')
+        if not username:
+            return self.error(line, 'username is required')
+
+        role = row.get('role') or 'student'
+        if role not in ROLES:
+            return self.error(line, f'unknown role "{role}"')
+
+        user_values = {field: row[field] for field in USER_FIELDS if field in row}
+        user_values['role'] = role
+        for field in ('phone_number', 'department'):
+            if field in user_values and not user_values[field]:
+                user_values[field] = None
+
+        profile_values = None
+        if role == 'teacher':
+            profile_values = {field: row[field] for field in PROFILE_FIELDS if field in row}
+            if 'total_slots' in profile_values:
+                try:
+                    profile_values['total_slots'] = int(profile_values['total_slots'] or 5)
+                except ValueError:
+                    return self.error(line, f"total_slots must be an integer, got \"{row['total_slots']}\"")
+                if profile_values['total_slots'] < 0:
+                    return self.error(line, 'total_slots cannot be negative')
+            if 'bio' in profile_values and not profile_values['bio']:
+                profile_values['bio'] = None
+
+        return username, user_values, row.get('password'), profile_values
+
+    def import_batch(self, batch):
+        cleaned = {}
+        for line, row in batch:
+            result = self.clean_row(line, row)
+            if result is None:
+                continue
+            if result[0] in cleaned:
+                self.error(line, f'duplicate username "{result[0]}" in batch')
+                continue
+            cleaned[result[0]] = (line,) + result[1:]
+
+        existing = User.objects.in_bulk(list(cleaned), field_name='username')
+        profiles = ProfessorProfile.objects.annotate(
+            in_use=Exists(Application.objects.filter(professor=OuterRef('pk')))
+            | Exists(ApplicationSubmission.objects.filter(professor=OuterRef('pk'), status='queued'))
+        ).in_bulk([user.pk for user in existing.values()])
+
+        # Validate every row before anything in the batch is written
+        for username, (line, values, password, profile_values) in list(cleaned.items()):
+            user = existing.get(username)
+            profile = profiles.get(user.pk) if user else None
+            message = None
+            if user is None and not (password or self.options['default_password']):
+                message = 'password is required for new users'
+            elif profile is None:
+                pass
+            elif values['role'] != 'teacher' and profile.in_use:
+                message = 'cannot change the role of a professor who has applications'
+            elif profile_values and profile_values.get('total_slots', profile.total_slots) < profile.filled_slots:
+                message = f'total_slots cannot drop below {profile.filled_slots} filled slots'
+            if message:
+                self.error(line, message)
+                del cleaned[username]
+
+        new_users, changed_users, changed_fields, to_hash = [], [], set(), []
+        role_changed, dropped_profiles = [], []
+        for username, (line, values, password, _) in cleaned.items():
+            user = existing.get(username)
+            if user is None:
+                user = User(username=username, **values)
+                new_users.append(user)
+                to_hash.append((user, password or self.options['default_password']))
+                continue
+
+            fields = {field for field, value in values.items() if getattr(user, field) != value}
+            for field in fields:
+                setattr(user, field, values[field])
+            if password and self.options['update_passwords']:
+                to_hash.append((user, password))
+                fields.add('password')
+            if fields:
+                changed_users.append(user)
+                changed_fields |= fields
+            if 'role' in fields:
+                role_changed.append(user.pk)
+                if user.pk in profiles and user.role != 'teacher':
+                    dropped_profiles.append(user.pk)
+
+        if self.options['dry_run']:
+            self.count_results(cleaned, new_users, changed_users)
+            return
+
+        # PBKDF2 is CPU bound, so spread the hashing over the process pool
+        hashes = self.pool.map(_hash_password, [password for _, password in to_hash], chunksize=16)
+        for (user, _), hashed in zip(to_hash, hashes):
+            user.password = hashed
+
+        with transaction.atomic():
+            User.objects.bulk_create(new_users)
+            if changed_users:
+                User.objects.bulk_update(changed_users, sorted(changed_fields))
+            # Former teachers lose their profile; rows with applications were refused above
+            if dropped_profiles:
+                ProfessorProfile.objects.filter(pk__in=dropped_profiles).delete()
+
+            user_ids = dict(User.objects.filter(username__in=cleaned).values_list('username', 'pk'))
+            profile_changes = self.import_profiles(cleaned, user_ids, profiles)
+
+            # bulk_update skips the post_save signal that drops cached claims
+            if role_changed:
+                invalidate_claims(*role_changed)
+
+        self.count_results(cleaned, new_users, changed_users, profile_changes)
+
+    def import_profiles(self, cleaned, user_ids, existing):
+        """Upsert professor profiles and their domains; return usernames whose profile changed"""
+        rows = {
+            user_ids[username]: (username, profile_values)
+            for username, (_, _, _, profile_values) in cleaned.items()
+            if profile_values is not None and username in user_ids
+        }
+        if not rows:
+            return set()
+
+        new_profiles, changed_profiles, changed_fields, resync = [], [], set(), []
+        changed = set()
+        for user_id, (username, values) in rows.items():
+            profile = existing.get(user_id)
+            if profile is None:
+                profile = ProfessorProfile(user_id=user_id, **{'research_domains': '', **values})
+                new_profiles.append(profile)
+                resync.append(profile)
+                changed.add(username)
+                continue
+
+            fields = {field for field, value in values.items() if getattr(profile, field) != value}
+            for field in fields:
+                setattr(profile, field, values[field])
+            if fields:
+                changed_profiles.append(profile)
+                changed_fields |= fields
+                changed.add(username)
+                if 'research_domains' in fields:
+                    resync.append(profile)
+
+        ProfessorProfile.objects.bulk_create(new_profiles)
+        if changed_profiles:
+            ProfessorProfile.objects.bulk_update(changed_profiles, sorted(changed_fields))
+
+        if resync:
+            self.sync_domains(resync)
+        return changed
+
+    def sync_domains(self, profiles):
+        """Replace the domain links of the given profiles with set-based writes"""
+        parsed = {profile.pk: parse_research_domains(profile.research_domains) for profile in profiles}
+        names = ', '.join(name for slugs in parsed.values() for name in slugs.values())
+        domain_ids = dict(ResearchDomain.objects.resolve(names).values_list('slug', 'pk'))
+
+        through = ProfessorProfile.domains.through
+        through.objects.filter(professorprofile_id__in=parsed).delete()
+        through.objects.bulk_create([
+            through(professorprofile_id=profile_id, researchdomain_id=domain_ids[slug])
+            for profile_id, slugs in parsed.items()
+            for slug in slugs
+        ])
+
+    def count_results(self, cleaned, new_users, changed_users, profile_changes=()):
+        created = {user.username for user in new_users}
+        updated = {user.username for user in changed_users} | set(profile_changes)
+        updated -= created
+        self.totals['created'] += len(created)
+        self.totals['updated'] += len(updated)
+        self.totals['unchanged'] += len(set(cleaned) - created - updated)
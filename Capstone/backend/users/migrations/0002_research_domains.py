@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResearchDomain',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Research Domain',
+                'verbose_name_plural': 'Research Domains',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='department',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='professorprofile',
+            name='domains',
+            field=models.ManyToManyField(blank=True, help_text='Normalized domains parsed from research_domains', related_name='professors', to='users.researchdomain'),
+        ),
+    ]
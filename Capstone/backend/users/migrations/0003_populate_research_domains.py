@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:45
+
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def populate_domains(apps, schema_editor):
+    """Parse existing comma-separated research_domains into ResearchDomain rows"""
+    ProfessorProfile = apps.get_model('users', 'ProfessorProfile')
+    ResearchDomain = apps.get_model('users', 'ResearchDomain')
+    Through = ProfessorProfile.domains.through
+
+    parsed = {}
+    names = {}
+    for profile_id, value in ProfessorProfile.objects.values_list('pk', 'research_domains').iterator():
+        slugs = []
+        for part in (value or '').split(','):
+            name = ' '.join(part.split())
+            slug = slugify(name)
+            if slug and slug not in slugs:
+                slugs.append(slug)
+                names.setdefault(slug, name)
+        parsed[profile_id] = slugs
+
+    ResearchDomain.objects.bulk_create(
+        [ResearchDomain(slug=slug, name=name) for slug, name in names.items()],
+        ignore_conflicts=True,
+    )
+    domain_ids = dict(ResearchDomain.objects.values_list('slug', 'pk'))
+
+    Through.objects.bulk_create(
+        [
+            Through(professorprofile_id=profile_id, researchdomain_id=domain_ids[slug])
+            for profile_id, slugs in parsed.items()
+            for slug in slugs
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_research_domains'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_domains, migrations.RunPython.noop),
+    ]
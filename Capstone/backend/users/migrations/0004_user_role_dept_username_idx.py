@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_populate_research_domains'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'department', 'username'], name='user_role_dept_username_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_role_dept_username_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='professorprofile',
+            name='waitlist_size',
+            field=models.PositiveIntegerField(default=0, help_text='Open applications taken beyond total_slots for the waitlist; 0 turns the waitlist off'),
+        ),
+    ]
@@ -1,5 +1,22 @@
+from collections import defaultdict
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import F
+from django.utils.text import slugify
+
+from project_allocation.batches import chunks
+
+
+def parse_research_domains(value):
+    """Split a comma-separated domain string into unique, trimmed names"""
+    names = {}
+    for part in (value or '').split(','):
+        name = ' '.join(part.split())
+        slug = slugify(name)
+        if slug and slug not in names:
+            names[slug] = name
+    return names
 
 
 class User(AbstractUser):
@@ -27,16 +44,113 @@ class User(AbstractUser):
     
     # Additional fields
     phone_number = models.CharField(max_length=15, blank=True, null=True)
-    department = models.CharField(max_length=100, blank=True, null=True)
+    department = models.CharField(max_length=100, blank=True, null=True, db_index=True)
     
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Keyset-paginated student discovery filters by role and department
+            models.Index(fields=['role', 'department', 'username'], name='user_role_dept_username_idx'),
+        ]
     
     def __str__(self):
         return f"{self.username} - {self.get_full_name()}"
 
 
+class ResearchDomainManager(models.Manager):
+    """Manager resolving domain names to normalized ResearchDomain rows"""
+    
+    def resolve(self, value):
+        """Return the domains named in a comma-separated string, creating missing ones"""
+        names = parse_research_domains(value)
+        if not names:
+            return self.none()
+        
+        existing = set(self.filter(slug__in=names).values_list('slug', flat=True))
+        missing = [
+            self.model(slug=slug, name=name)
+            for slug, name in names.items() if slug not in existing
+        ]
+        if missing:
+            self.bulk_create(missing, ignore_conflicts=True)
+        
+        return self.filter(slug__in=names)
+
+
+class ResearchDomain(models.Model):
+    """Normalized research domain tag shared between professors"""
+    
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    
+    objects = ResearchDomainManager()
+    
+    class Meta:
+        verbose_name = 'Research Domain'
+        verbose_name_plural = 'Research Domains'
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class ProfessorProfileQuerySet(models.QuerySet):
+    """QuerySet helpers for professor slots"""
+    
+    def reserve_slot(self, professor_id):
+        """Fill one slot with a conditional UPDATE; False if the professor is full"""
+        reserved = self.filter(pk=professor_id, filled_slots__lt=F('total_slots')).update(
+            filled_slots=F('filled_slots') + 1
+        ) == 1
+        if reserved:
+            self._slots_changed()
+        return reserved
+    
+    def release_slot(self, professor_id):
+        """Free one filled slot with a conditional UPDATE; False if none was filled"""
+        released = self.filter(pk=professor_id, filled_slots__gt=0).update(
+            filled_slots=F('filled_slots') - 1
+        ) == 1
+        if released:
+            self._slots_changed()
+        return released
+    
+    def fill_slots(self, counts):
+        """
+        Fill counts[professor_id] slots of each professor; returns the ids that had too few free.
+        
+        Rows are locked in pk order first and then filled with one UPDATE per
+        distinct count, so concurrent callers neither deadlock nor overfill.
+        Professors without enough free slots are left unchanged.
+        """
+        professor_ids = sorted(pk for pk, count in counts.items() if count)
+        for chunk in chunks(professor_ids):
+            list(self.select_for_update().filter(pk__in=chunk).order_by('pk').values_list('pk', flat=True))
+        
+        by_count = defaultdict(list)
+        for professor_id in professor_ids:
+            by_count[counts[professor_id]].append(professor_id)
+        filled = set()
+        for count, ids in by_count.items():
+            for chunk in chunks(ids):
+                ready = list(self.filter(
+                    pk__in=chunk, filled_slots__lte=F('total_slots') - count
+                ).values_list('pk', flat=True))
+                self.filter(pk__in=ready).update(filled_slots=F('filled_slots') + count)
+                filled.update(ready)
+        
+        if filled:
+            self._slots_changed()
+        return [professor_id for professor_id in professor_ids if professor_id not in filled]
+    
+    @staticmethod
+    def _slots_changed():
+        # Slots change through update(), which skips the directory signals
+        from . import directory
+        directory.invalidate()
+
+
 class ProfessorProfile(models.Model):
     """Extended profile for professors with research domains and slot management"""
     
@@ -44,9 +158,21 @@ class ProfessorProfile(models.Model):
     research_domains = models.TextField(
         help_text="Comma-separated research domains (e.g., AI, ML, Web Development)"
     )
+    domains = models.ManyToManyField(
+        ResearchDomain,
+        related_name='professors',
+        blank=True,
+        help_text="Normalized domains parsed from research_domains"
+    )
     bio = models.TextField(blank=True, null=True)
     total_slots = models.PositiveIntegerField(default=5)
     filled_slots = models.PositiveIntegerField(default=0)
+    waitlist_size = models.PositiveIntegerField(
+        default=0,
+        help_text="Open applications taken beyond total_slots for the waitlist; 0 turns the waitlist off"
+    )
+    
+    objects = ProfessorProfileQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'Professor Profile'
@@ -55,6 +181,24 @@ class ProfessorProfile(models.Model):
     def __str__(self):
         return f"Prof. {self.user.get_full_name()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_research_domains = instance.__dict__.get('research_domains')
+        instance._loaded_slots = (instance.__dict__.get('total_slots'), instance.__dict__.get('filled_slots'))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        
+        # Keep the normalized domain table in step with the free-text field
+        if getattr(self, '_loaded_research_domains', None) != self.research_domains:
+            self.sync_domains()
+    
+    def sync_domains(self):
+        self.domains.set(ResearchDomain.objects.resolve(self.research_domains))
+        self._loaded_research_domains = self.research_domains
+    
     @property
     def available_slots(self):
         return self.total_slots - self.filled_slots
@@ -1,6 +1,6 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
-from .models import User, ProfessorProfile
+from .models import User, ProfessorProfile, ResearchDomain
+from .login_pool import get_login_pool
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -12,15 +12,31 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
+class ResearchDomainSerializer(serializers.ModelSerializer):
+    """Serializer for ResearchDomain model"""
+    
+    class Meta:
+        model = ResearchDomain
+        fields = ('slug', 'name')
+
+
 class ProfessorProfileSerializer(serializers.ModelSerializer):
     """Serializer for ProfessorProfile model"""
     
     user = UserSerializer(read_only=True)
+    domains = ResearchDomainSerializer(many=True, read_only=True)
     available_slots = serializers.ReadOnlyField()
     
     class Meta:
         model = ProfessorProfile
-        fields = ('user', 'research_domains', 'bio', 'total_slots', 'filled_slots', 'available_slots')
+        fields = (
+            'user', 'research_domains', 'domains', 'bio', 'total_slots', 'filled_slots', 'available_slots',
+            'waitlist_size'
+        )
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset, prefix=''):
+        return queryset.select_related(f'{prefix}user').prefetch_related(f'{prefix}domains')
 
 
 class LoginSerializer(serializers.Serializer):
@@ -34,7 +50,12 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
         
         if username and password:
-            user = authenticate(username=username, password=password)
+            # Only a bounded number of logins hash at once, so a burst
+            # cannot tie up every request thread
+            user = get_login_pool().authenticate(
+                self.context.get('request'), username=username, password=password
+            )
+            
             if not user:
                 raise serializers.ValidationError('Invalid credentials')
             if not user.is_active:
@@ -0,0 +1,41 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import directory
+from .claims import invalidate_claims
+from .models import User, ProfessorProfile, ResearchDomain
+
+
+@receiver(post_save, sender=ProfessorProfile)
+@receiver(post_delete, sender=ProfessorProfile)
+@receiver(post_save, sender=ResearchDomain)
+@receiver(post_delete, sender=ResearchDomain)
+def invalidate_professor_directory(sender, **kwargs):
+    """Rebuild the professor directory snapshot when professors change"""
+    directory.invalidate()
+
+
+@receiver(m2m_changed, sender=ProfessorProfile.domains.through)
+def invalidate_professor_domains(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        directory.invalidate()
+
+
+@receiver(post_save, sender=User)
+def invalidate_professor_user(sender, instance, created, **kwargs):
+    # Students never appear in the directory; new users have no profile yet
+    if not created and instance.role != 'student':
+        directory.invalidate()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_claims(sender, instance, created, **kwargs):
+    """Drop cached users and token claims after role or account changes"""
+    if not created:
+        invalidate_claims(instance.pk)
+
+
+@receiver(post_save, sender=ProfessorProfile)
+@receiver(post_delete, sender=ProfessorProfile)
+def invalidate_professor_claims(sender, instance, **kwargs):
+    invalidate_claims(instance.user_id)
@@ -0,0 +1,39 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .claims import VERSION_CLAIM, claims_version, resolve_claims
+from .models import User
+
+
+def stamp_claims(token, user):
+    """Write the user's current claims and claims version into a token"""
+    token[VERSION_CLAIM] = claims_version(user.pk)
+    for name, value in resolve_claims(user).items():
+        token[name] = value
+    return token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry role, team and professor claims"""
+
+    @classmethod
+    def for_user(cls, user):
+        return stamp_claims(super().for_user(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh that re-stamps claims so refreshed access tokens are current"""
+
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(pk=refresh['user_id'], is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+
+        data['access'] = str(stamp_claims(refresh.access_token, user))
+        return data
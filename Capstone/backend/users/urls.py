@@ -6,7 +6,9 @@ app_name = 'users'
 urlpatterns = [
     path('auth/register/', views.RegisterView.as_view(), name='register'),
     path('auth/login/', views.LoginView.as_view(), name='login'),
+    path('auth/token/refresh/', views.ClaimsTokenRefreshView.as_view(), name='token-refresh'),
     path('auth/me/', views.current_user, name='current_user'),
+    path('auth/login/metrics/', views.login_metrics, name='login-metrics'),
     path('profile/', views.UserProfileView.as_view(), name='profile'),
     path('professors/', views.ProfessorListView.as_view(), name='professor-list'),
     path('professors/<int:pk>/', views.ProfessorDetailView.as_view(), name='professor-detail'),
@@ -1,11 +1,17 @@
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from django.http import Http404
 
+from . import directory
+from .login_pool import get_login_pool
+from .tokens import ClaimsRefreshToken, ClaimsTokenRefreshSerializer
 from .models import User, ProfessorProfile
+from .filters import ProfessorFilter, ProfessorSearchFilter, professor_facets
 from .serializers import (
     UserSerializer, 
     ProfessorProfileSerializer, 
@@ -31,7 +37,7 @@ class LoginView(generics.GenericAPIView):
         serializer.is_valid(raise_exception=True)
         
         user = serializer.validated_data['user']
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         
         return Response({
             'user': UserSerializer(user).data,
@@ -40,6 +46,11 @@ class LoginView(generics.GenericAPIView):
         })
 
 
+class ClaimsTokenRefreshView(TokenRefreshView):
+    """API view for refreshing access tokens with up-to-date claims"""
+    serializer_class = ClaimsTokenRefreshSerializer
+
+
 class UserProfileView(generics.RetrieveUpdateAPIView):
     """API view for user profile management"""
     serializer_class = UserSerializer
@@ -50,21 +61,80 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
 
 
 class ProfessorListView(generics.ListAPIView):
-    """API view for listing professors with search and filter capabilities"""
-    queryset = ProfessorProfile.objects.all()
+    """API view for listing professors with search, domain facets and filter capabilities"""
+    queryset = ProfessorProfile.objects.select_related('user').prefetch_related('domains')
     serializer_class = ProfessorProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['user__department']
-    search_fields = ['user__first_name', 'user__last_name', 'user__username', 'research_domains']
+    filter_backends = [DjangoFilterBackend, ProfessorSearchFilter, OrderingFilter]
+    filterset_class = ProfessorFilter
+    # Domains are searched by ProfessorSearchFilter through the slug index
+    search_fields = ['user__first_name', 'user__last_name', 'user__username']
     ordering_fields = ['user__first_name', 'user__last_name', 'total_slots', 'filled_slots']
+    
+    def list(self, request, *args, **kwargs):
+        if not directory.enabled():
+            response = super().list(request, *args, **kwargs)
+            queryset = self.filter_queryset(self.get_queryset())
+            response.data['facets'] = professor_facets(queryset)
+            return response
+        
+        params = request.query_params
+        snapshot = directory.get_snapshot()
+        domains = [slug for slug in params.getlist('domain') if slug]
+        unknown = [slug for slug in domains if slug not in snapshot.domain_slugs]
+        if unknown:
+            # Same error the database path's ProfessorFilter raises
+            raise ValidationError({'domain': [
+                f'Select a valid choice. {unknown[0]} is not one of the available choices.'
+            ]}, code='invalid_choice')
+        
+        entries = snapshot.filter(
+            department=params.get('department') or params.get('user__department'),
+            domains=domains,
+            search=params.get(SearchFilter.search_param),
+            ordering=self.get_ordering(request),
+        )
+        
+        page = self.paginate_queryset(entries)
+        response = self.get_paginated_response(page)
+        response.data['facets'] = snapshot.facets(entries)
+        response['X-Directory-Version'] = snapshot.version
+        return response
+    
+    def get_ordering(self, request):
+        params = request.query_params.get(OrderingFilter.ordering_param, '')
+        fields = [param.strip() for param in params.split(',')]
+        return [field for field in fields if field.lstrip('-') in self.ordering_fields]
 
 
 class ProfessorDetailView(generics.RetrieveAPIView):
     """API view for professor detail"""
-    queryset = ProfessorProfile.objects.all()
+    queryset = ProfessorProfile.objects.select_related('user').prefetch_related('domains')
     serializer_class = ProfessorProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+    
+    def retrieve(self, request, *args, **kwargs):
+        if not directory.enabled():
+            return super().retrieve(request, *args, **kwargs)
+        
+        snapshot = directory.get_snapshot()
+        entry = snapshot.get(self.kwargs['pk'])
+        if entry is None:
+            raise Http404
+        
+        response = Response(entry)
+        response['X-Directory-Version'] = snapshot.version
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def login_metrics(request):
+    """Get login pool queue and hashing metrics for this worker (admin only)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    return Response(get_login_pool().metrics())
 
 
 @api_view(['GET'])
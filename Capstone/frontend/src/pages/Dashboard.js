@@ -16,7 +16,7 @@ import {
   CircularProgress,
 } from '@mui/material';
 import { useAuth } from '../contexts/AuthContext';
-import api from '../services/api';
+import api, { openEventStream } from '../services/api';
 
 const Dashboard = () => {
   const { user } = useAuth();
@@ -35,11 +35,20 @@ const Dashboard = () => {
     // eslint-disable-next-line
   }, [user]);
 
+  // Refresh when a team or application decision is pushed instead of polling
+  useEffect(() => {
+    if (user?.role !== 'student') {
+      return undefined;
+    }
+    return openEventStream(() => fetchMyTeam());
+    // eslint-disable-next-line
+  }, [user]);
+
   const fetchMyTeam = async () => {
     setLoading(true);
     try {
-      const response = await api.get('/api/teams/my/');
-      setMyTeam(response.data);
+      const response = await api.get('/api/bootstrap/');
+      setMyTeam(response.data.team);
     } catch (error) {
       if (error.response?.status === 404) {
         setMyTeam(null);
@@ -56,4 +56,34 @@ api.interceptors.response.use(
   }
 );
 
+// Subscribe to the server-sent event stream for the logged-in user.
+// EventSource cannot send headers, so the access token goes in the query
+// string; the browser reconnects on its own with Last-Event-ID.
+export const openEventStream = (onEvent) => {
+  const token = localStorage.getItem('access_token');
+  if (!token || typeof EventSource === 'undefined') {
+    return () => {};
+  }
+
+  const baseURL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+  const source = new EventSource(`${baseURL}/api/events/stream/?token=${encodeURIComponent(token)}`);
+  const handler = (message) => onEvent(message.type, JSON.parse(message.data));
+  const kinds = [
+    'team.invited',
+    'team.invitation_accepted',
+    'team.invitation_rejected',
+    'application.submitted',
+    'application.submission_processed',
+    'application.accepted',
+    'application.rejected',
+    'application.withdrawn',
+    'application.waitlisted',
+    'application.promoted',
+    'application.slot_filled',
+  ];
+  kinds.forEach((kind) => source.addEventListener(kind, handler));
+
+  return () => source.close();
+};
+
 export default api; 
\ No newline at end of file